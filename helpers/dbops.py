@@ -1,113 +1,308 @@
 import tabulate
 
+import atexit
+import collections
+import collections.abc
 import os
+import random
 import sqlite3
 import sys
+import time
 
 # code necessary for proper cross imports
 main_dir = os.path.split(os.path.abspath(__file__))[0]
 sys.path.append(main_dir)
 
+import gridops
 import miscellaneous
 import validateops
 
+# Solution cache
+CACHE_NAME = "cache.db"
+CACHE_SIZE = 1_000_000
+# Puzzles looked up with one query, below SQLite's limit of 999 parameters in old builds
+CACHE_CHUNK = 500
+# Entries read ahead of the results, solver stream is restarted when there are more
+CACHE_AHEAD = 50_000
 
-def get_data(db_name: str, db_content: str, target="") -> None:
+# Per puzzle details are committed every DETAILS_BATCH rows
+DETAILS_BATCH = 10_000
+# Details of a run whose process can't be checked are stale after DETAILS_STALE seconds
+DETAILS_STALE = 7 * 24 * 60 * 60
+
+# Latency percentiles shown in reports, nearest rank
+PERCENTILES = (50, 90, 99)
+
+# Browsing shows runs a page at a time, in an order served by the indexes from create_indexes
+PAGE_SIZE = 20
+NEWEST_FIRST = "ORDER BY test_date DESC, start_time DESC, rowid DESC"
+OLDEST_FIRST = "ORDER BY test_date, start_time, rowid"
+BROWSE_FILTERS = {
+    "all": "",
+    "presentation": "presentation_method = ?",
+    "method": "solve_method = ?",
+    "date": "test_date = ?",
+}
+
+
+def get_data(
+    db_conn: sqlite3.Connection,
+    db_content: str,
+    target="",
+    key=None,
+    backwards=False,
+    page_size=PAGE_SIZE,
+) -> tuple[tuple | None, tuple | None]:
     """
-    Connects to DB and reads the data to be fetched from DB table.
-    Then prints them to the screen.
+    Reads the data to be fetched from DB table using the session connection.
+    Then prints them to the screen, one page at a time.
+    Pages are found by the key of the last row shown, (test_date, start_time, rowid),
+    so any page takes as long as the first one.
 
-    :param db_name: Name of database file
+    :param db_conn: SQLite3 connection object kept open for the whole session
     :param db_content: What is to be read from the db
-    :param target: A str describing what should be modified when dropping entry or table
+    :param target: A str with the value to filter by, or a rowid when deleting an entry
+    :param key: Key of the row next to the wanted page, None for the newest page
+    :param backwards: Whether the wanted page holds newer rows than the key
+    :param page_size: How many rows are shown on a page
+    :return: Keys to pass for the newer and the older page, None where there is no such page
+    :rtype: tuple
     """
 
-    cursor, db_conn = conn_to_db(db_name)
-
-    # Create table headers
-    cursor.execute("SELECT rowid, * FROM statistics")
-    names = list(map(lambda header: header[0], cursor.description))
+    cursor = db_conn.cursor()
 
-    # Get the data
     match db_content:
-        case "all":
-            cursor.execute(
-                "SELECT rowid, * FROM statistics ORDER BY test_date DESC, start_time DESC"
-            )
-        case "test":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE presentation_method LIKE '{db_content}%'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "file":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE presentation_method LIKE '%{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "screen":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE presentation_method LIKE '%{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "R&B":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE solve_method LIKE '{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "Boosted R&B":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE solve_method LIKE '{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "DLXSudoku":
-            cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE solve_method LIKE '{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
-            )
-        case "Random walk":
+        case "all" | "presentation" | "method" | "date":
+            # Filters are equalities on indexed columns.
+            conditions, params = [], []
+            if BROWSE_FILTERS[db_content]:
+                conditions.append(BROWSE_FILTERS[db_content])
+                params.append(target)
+            if key is not None:
+                sign = ">" if backwards else "<"
+                conditions.append(f"(test_date, start_time, rowid) {sign} (?, ?, ?)")
+                params.extend(key)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
             cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE solve_method LIKE '{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
+                f"""SELECT rowid, * FROM statistics {where}
+                {OLDEST_FIRST if backwards else NEWEST_FIRST}""",
+                params,
             )
-        case "Cake Algorithm":
+        case "delete":
+            cursor.execute("DELETE FROM statistics WHERE rowid = ?", (int(target),))
             cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE solve_method LIKE '{db_content}'
-                ORDER BY test_date DESC, start_time DESC"""
+                "SELECT count(*) FROM sqlite_master WHERE type='table' AND name='puzzle_details'"
             )
-        case "date":
+            if cursor.fetchone()[0]:
+                cursor.execute(
+                    "DELETE FROM puzzle_details WHERE run_id = ?", (int(target),)
+                )
+            # SQLite gives a deleted last rowid to the next run,
+            # so the export watermark must not stay above the rows left.
+            create_export_table(cursor)
             cursor.execute(
-                f"""SELECT rowid, * FROM statistics WHERE test_date LIKE '{target}'
-                ORDER BY test_date DESC, start_time DESC"""
+                """UPDATE export_watermark
+                SET run_id = (SELECT IFNULL(MAX(rowid), 0) FROM statistics)
+                WHERE run_id > (SELECT IFNULL(MAX(rowid), 0) FROM statistics)"""
             )
-        case "delete":
-            cursor.execute(f"DELETE FROM statistics WHERE rowid = {int(target)}")
             db_conn.commit()
+            return None, None
         case "drop":
-            cursor.execute(f"DROP TABLE {target}")
+            cursor.execute("DROP TABLE statistics")
+            cursor.execute("DROP TABLE IF EXISTS puzzle_details")
+            cursor.execute("DROP TABLE IF EXISTS details_tokens")
+            cursor.execute("DROP TABLE IF EXISTS export_watermark")
             db_conn.commit()
+            return None, None
         case _:
             sys.exit("Unexpected situation. Quitting...")
 
-    if db_content not in ("delete", "drop", "save"):
-        db = cursor.fetchall()
-        formatting = [
-            "d",  # rowid
-            "",  # presentation method
-            "",  # solve method
-            "",  # date
-            "",  # time
-            ".3f",  # duration
-            ",d",  # puzzles
-            ",d",  # solutions
-            ".7f",  # avg solve time
-            ".0%",  # solutions ratio
-        ]
-        print(
-            tabulate.tabulate(
-                db, headers=names, tablefmt="simple", intfmt=",", floatfmt=formatting
-            )
+    # Table headers come from the query itself
+    names = list(map(lambda header: header[0], cursor.description))
+    # One row more than shown tells if there is another page.
+    db = cursor.fetchmany(page_size + 1)
+    cursor.close()
+    more = len(db) > page_size
+    db = db[:page_size]
+    if backwards:
+        db.reverse()
+    formatting = [
+        "d",  # rowid
+        "",  # presentation method
+        "",  # solve method
+        "",  # date
+        "",  # time
+        ".3f",  # duration
+        ",d",  # puzzles
+        ",d",  # solutions
+        ".7f",  # avg solve time
+        ".0%",  # solutions ratio
+        ",d",  # timeouts
+        ",d",  # unique solutions
+        ",d",  # multiple solutions
+        ",d",  # cache hits
+    ]
+    print(
+        tabulate.tabulate(
+            db, headers=names, tablefmt="simple", intfmt=",", floatfmt=formatting
         )
-    db_conn.close()
+    )
+    if not db:
+        return None, None
+
+    # The page we came from lies behind the key, the extra row shows one ahead.
+    if backwards:
+        newer_page, older_page = more, True
+    else:
+        newer_page, older_page = key is not None, more
+    # Key columns are test_date and start_time, then rowid.
+    newer = (*db[0][3:5], db[0][0]) if newer_page else None
+    older = (*db[-1][3:5], db[-1][0]) if older_page else None
+
+    return newer, older
+
+
+def get_report(
+    db_conn: sqlite3.Connection, first_date="0000-00-00", last_date="9999-99-99"
+) -> None:
+    """
+    Prints latency percentiles and throughput of every solve method
+    for runs between given dates. Latencies come from per puzzle details (--details),
+    so methods without them show only runs, puzzles and puzzles per second.
+
+    :param db_conn: SQLite3 connection object kept open for the whole session
+    :param first_date: First date of the range, YYYY-MM-DD
+    :param last_date: Last date of the range, YYYY-MM-DD
+    """
+
+    rows = report_rows(
+        db_conn.cursor(),
+        "solve_method",
+        "test_date BETWEEN ? AND ?",
+        (first_date, last_date),
+    )
+    headers = ["solve_method", "runs", "puzzles", "puzzles/s"]
+    headers += [f"p{percentile} ms" for percentile in PERCENTILES]
+    headers += ["max ms", "nodes/s"]
+    print(
+        tabulate.tabulate(
+            rows, headers=headers, tablefmt="simple", intfmt=",", floatfmt=",.3f"
+        )
+    )
+
+
+def compare_runs(db_conn: sqlite3.Connection, first_run: int, second_run: int) -> None:
+    """
+    Prints latency percentiles and throughput of two runs side by side,
+    with the ratio of the second run to the first one.
+
+    :param db_conn: SQLite3 connection object kept open for the whole session
+    :param first_run: Rowid of the first run
+    :param second_run: Rowid of the second run
+    """
+
+    cursor = db_conn.cursor()
+    rows = report_rows(cursor, "run_id", "rowid IN (?, ?)", (first_run, second_run))
+    cursor.execute(
+        """SELECT rowid, solve_method, test_date, start_time FROM statistics
+        WHERE rowid IN (?, ?)""",
+        (first_run, second_run),
+    )
+    runs = {run[0]: run[1:] for run in cursor.fetchall()}
+    rows = {row[0]: row for row in rows}
+    if first_run not in rows or second_run not in rows:
+        missing = first_run if first_run not in rows else second_run
+        print(f"No run with rowid {missing}.")
+        return
+
+    # Values start after group and number of runs, see report_rows.
+    names = ["puzzles", "puzzles/s"]
+    names += [f"p{percentile} ms" for percentile in PERCENTILES]
+    names += ["max ms", "nodes/s"]
+    table = [
+        ["solve_method", runs[first_run][0], runs[second_run][0], None],
+        [
+            "started",
+            *(" ".join(runs[run][1:]) for run in (first_run, second_run)),
+            None,
+        ],
+    ]
+    # Columns mix text and numbers, so numbers are formatted here.
+    for index, name in enumerate(names, 2):
+        first, second = rows[first_run][index], rows[second_run][index]
+        ratio = second / first if first and second is not None else None
+        cells = []
+        for value in (first, second, ratio):
+            if isinstance(value, float):
+                value = f"{value:,.3f}"
+            elif isinstance(value, int):
+                value = f"{value:,}"
+            cells.append(value)
+        table.append([name, *cells])
+    print(
+        tabulate.tabulate(
+            table,
+            headers=["", f"run {first_run}", f"run {second_run}", "ratio"],
+            tablefmt="simple",
+            missingval="N/A",
+            colalign=("left", "right", "right", "right"),
+            disable_numparse=True,
+        )
+    )
+
+
+def report_rows(
+    cursor: sqlite3.Cursor, group: str, condition: str, params: tuple
+) -> list[tuple]:
+    """
+    Aggregates runs and their per puzzle details in SQL, in one query.
+    Percentiles are nearest rank, the smallest latency with at least given part
+    of latencies at or below it, found with window functions.
+
+    :param cursor: DB cursor object
+    :param group: Column of "statistics" to group by, "solve_method" or "run_id"
+    :param condition: SQL condition choosing runs from "statistics"
+    :param params: Values for the condition
+    :return: Group, runs, puzzles, puzzles per second, latency percentiles and max in ms,
+    nodes per second, latency and nodes are None for groups without details.
+    Puzzles per second count only solved puzzles, not the ones taken from the cache
+    :rtype: list of tuples
+    """
+
+    create_details_table(cursor)
+    percentiles = ",".join(
+        f"MIN(CASE WHEN position >= {percentile / 100} * measured THEN latency_ns END)"
+        f" / 1e6 AS p{percentile}"
+        for percentile in PERCENTILES
+    )
+    columns = ",".join(f"latencies.p{percentile}" for percentile in PERCENTILES)
+    cursor.execute(
+        f"""WITH runs AS (
+            SELECT rowid AS run_id, * FROM statistics WHERE {condition}
+        ),
+        ranked AS (
+            SELECT runs.{group} AS grouped, latency_ns, nodes,
+            ROW_NUMBER() OVER (PARTITION BY runs.{group} ORDER BY latency_ns) AS position,
+            COUNT(*) OVER (PARTITION BY runs.{group}) AS measured
+            FROM puzzle_details JOIN runs USING (run_id)
+            WHERE latency_ns IS NOT NULL
+        ),
+        latencies AS (
+            SELECT grouped, {percentiles},
+            MAX(latency_ns) / 1e6 AS slowest,
+            SUM(nodes) * 1e9 / SUM(CASE WHEN nodes IS NOT NULL THEN latency_ns END)
+            AS nodes_per_second
+            FROM ranked GROUP BY grouped
+        )
+        SELECT runs.{group}, COUNT(*), SUM(puzzles_read),
+        SUM(puzzles_read - IFNULL(cache_hits, 0)) / SUM(duration_time), {columns},
+        latencies.slowest, latencies.nodes_per_second
+        FROM runs LEFT JOIN latencies ON latencies.grouped = runs.{group}
+        GROUP BY runs.{group} ORDER BY runs.{group}""",
+        params,
+    )
+
+    return cursor.fetchall()
 
 
 def termination(db_conn: object) -> None:
@@ -146,7 +341,11 @@ def write_to_db(
     solutions_found: int,
     avg_solve_time: float,
     db_name: str,
-) -> None:
+    timeouts=0,
+    unique_solutions=None,
+    multiple_solutions=None,
+    cache_hits=0,
+) -> int:
     """
     Establishes a SQLite DB if there is no DB called "stats.db",
     or creates the table called "statistics" if there is none.
@@ -161,6 +360,12 @@ def write_to_db(
     :param solutions_found: How many puzzles were solved
     :param avg_solve_time: Average time needed to solve one puzzle using given method
     :param db_name: A string representing db name
+    :param timeouts: How many puzzles were given up after running out of budget
+    :param unique_solutions: How many puzzles have exactly one solution, None if not counted
+    :param multiple_solutions: How many puzzles have more than one solution, None if not counted
+    :param cache_hits: How many solutions were taken from the solution cache
+    :return: Rowid of the new entry
+    :rtype: int
     """
 
     file_present = validateops.validate_file(db_name)
@@ -183,8 +388,27 @@ def write_to_db(
             puzzles_read INTEGER,
             solutions_found INTEGER,
             avg_solve_time REAL,
-            solutions_ratio REAL)"""
+            solutions_ratio REAL,
+            timeouts INTEGER DEFAULT 0,
+            unique_solutions INTEGER,
+            multiple_solutions INTEGER,
+            cache_hits INTEGER DEFAULT 0)"""
         )
+
+    # Tables made by older versions need new columns added.
+    else:
+        cursor.execute("SELECT name FROM pragma_table_info('statistics')")
+        columns = [row[0] for row in cursor.fetchall()]
+        for column, column_type in (
+            ("timeouts", "INTEGER DEFAULT 0"),
+            ("unique_solutions", "INTEGER"),
+            ("multiple_solutions", "INTEGER"),
+            ("cache_hits", "INTEGER DEFAULT 0"),
+        ):
+            if column not in columns:
+                cursor.execute(
+                    f"ALTER TABLE statistics ADD COLUMN {column} {column_type}"
+                )
     solutions_ratio = solutions_found / puzzles_read
 
     # Entries to be added to DB.
@@ -199,14 +423,455 @@ def write_to_db(
             solutions_found,
             avg_solve_time,
             solutions_ratio,
+            timeouts,
+            unique_solutions,
+            multiple_solutions,
+            cache_hits,
         ),
     )
 
     # Add the data
-    cursor.execute("INSERT INTO statistics VALUES(?,?,?,?,?,?,?,?,?)", entries[0])
+    cursor.execute(
+        """INSERT INTO statistics(
+        presentation_method,
+        solve_method,
+        test_date,
+        start_time,
+        duration_time,
+        puzzles_read,
+        solutions_found,
+        avg_solve_time,
+        solutions_ratio,
+        timeouts,
+        unique_solutions,
+        multiple_solutions,
+        cache_hits)
+        VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+        entries[0],
+    )
+    rowid = cursor.lastrowid
+    create_indexes(cursor)
     db_conn.commit()
     db_conn.close()
 
+    return rowid
+
+
+def create_indexes(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the indexes of the "statistics" table if there are none.
+    Every browsing filter is an equality on the leading column,
+    followed by the columns runs are ordered by.
+
+    :param cursor: DB cursor object
+    """
+
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS statistics_solve_method
+        ON statistics(solve_method, test_date, start_time)"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS statistics_presentation
+        ON statistics(presentation_method, test_date, start_time)"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS statistics_started
+        ON statistics(test_date, start_time)"""
+    )
+
+
+def create_details_table(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the "puzzle_details" table and its index if there are none,
+    and the "details_tokens" table of runs still writing their details.
+
+    :param cursor: DB cursor object
+    """
+
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS puzzle_details(
+        run_id INTEGER,
+        puzzle_number INTEGER,
+        puzzle TEXT,
+        latency_ns INTEGER,
+        nodes INTEGER,
+        backtracks INTEGER,
+        validator_calls INTEGER)"""
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS puzzle_details_run ON puzzle_details(run_id)"
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS details_tokens(
+        token INTEGER PRIMARY KEY,
+        pid INTEGER,
+        started REAL)"""
+    )
+
+
+def clear_stale_details(cursor: sqlite3.Cursor) -> int:
+    """
+    Deletes details written under tokens of runs that never got to close() or discard(),
+    killed ones for example. Such a run is stale when its process is gone,
+    or on Windows, where that can't be checked safely, when it started long ago
+    (DETAILS_STALE).
+    Rows under a token that isn't registered at all are stale too.
+
+    :param cursor: DB cursor object
+    :return: Number of rows deleted
+    :rtype: int
+    """
+
+    cursor.execute("SELECT token, pid, started FROM details_tokens")
+    stale = [
+        (token,)
+        for token, pid, started in cursor.fetchall()
+        if not process_running(pid, started)
+    ]
+    cursor.executemany("DELETE FROM details_tokens WHERE token = ?", stale)
+    cursor.execute(
+        """DELETE FROM puzzle_details
+        WHERE run_id < 0 AND run_id NOT IN (SELECT token FROM details_tokens)"""
+    )
+
+    return cursor.rowcount
+
+
+def process_running(pid: int, started: float) -> bool:
+    """
+    Tells if the process writing details may still be running.
+
+    :param pid: Process id
+    :param started: Unix time the process started writing at
+    :return: False if the process is gone
+    :rtype: bool
+    """
+
+    # On Windows os.kill() terminates the process, so only the age is checked there.
+    if os.name == "nt":
+        return time.time() - started < DETAILS_STALE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def create_export_table(cursor: sqlite3.Cursor) -> None:
+    """
+    Creates the "export_watermark" table if there is none.
+    It holds the rowid of the last run saved by an incremental export, in a single row.
+
+    :param cursor: DB cursor object
+    """
+
+    cursor.execute("CREATE TABLE IF NOT EXISTS export_watermark(run_id INTEGER)")
+
+
+class DetailsSink:
+    """
+    Writes per puzzle details of a run (latency, search nodes, backtracks
+    and validator calls) to the "puzzle_details" table, in large transactions.
+    Run isn't in the "statistics" table until it ends, so rows are written under
+    a negative token of their own, and close() links them to the run.
+    Runs made at the same time keep apart that way. Rows of a run that doesn't
+    get to close() are deleted at exit, and rows of a killed run by the next one
+    (see clear_stale_details()).
+    """
+
+    def __init__(self, db_name: str, batch_size=DETAILS_BATCH) -> None:
+        """
+        Opens the database, creating the tables if there are none,
+        clears details left by killed runs and registers a token for this one.
+
+        :param db_name: Name of database file
+        :param batch_size: How many rows are written in one transaction
+        """
+
+        self.db_conn = sqlite3.connect(db_name)
+        self.cursor = self.db_conn.cursor()
+        create_details_table(self.cursor)
+        clear_stale_details(self.cursor)
+        self.token = -1 - random.getrandbits(62)
+        self.cursor.execute(
+            "INSERT INTO details_tokens VALUES(?,?,?)",
+            (self.token, os.getpid(), time.time()),
+        )
+        self.db_conn.commit()
+        self.batch_size = batch_size
+        self.rows = []
+        self.written = 0
+        atexit.register(self.discard)
+
+    def write(self, puzzle: str, effort: tuple | None) -> None:
+        """
+        Adds a row to the buffer, writing the buffer out when it's full.
+
+        :param puzzle: Puzzle string
+        :param effort: Latency in ns, nodes, backtracks and validator calls, None if not measured
+        """
+
+        self.written += 1
+        self.rows.append((self.token, self.written, puzzle, *(effort or (None,) * 4)))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered rows to the table in one transaction.
+        """
+
+        self.cursor.executemany(
+            """INSERT INTO puzzle_details(
+            run_id,
+            puzzle_number,
+            puzzle,
+            latency_ns,
+            nodes,
+            backtracks,
+            validator_calls)
+            VALUES(?,?,?,?,?,?,?)""",
+            self.rows,
+        )
+        self.db_conn.commit()
+        self.rows.clear()
+
+    def close(self, run_id: int) -> None:
+        """
+        Writes what's left in the buffer, links rows to the run and closes the database.
+
+        :param run_id: Rowid of the run in the "statistics" table
+        """
+
+        self.flush()
+        self.cursor.execute(
+            "UPDATE puzzle_details SET run_id = ? WHERE run_id = ?",
+            (run_id, self.token),
+        )
+        self.cursor.execute("DELETE FROM details_tokens WHERE token = ?", (self.token,))
+        self.db_conn.commit()
+        self.db_conn.close()
+        atexit.unregister(self.discard)
+
+    def discard(self) -> None:
+        """
+        Deletes rows of a run that ended without close() and closes the database.
+        """
+
+        self.cursor.execute(
+            "DELETE FROM puzzle_details WHERE run_id = ?", (self.token,)
+        )
+        self.cursor.execute("DELETE FROM details_tokens WHERE token = ?", (self.token,))
+        self.db_conn.commit()
+        self.db_conn.close()
+        atexit.unregister(self.discard)
+
+
+class SolutionCache:
+    """
+    Solutions found earlier, kept in a separate SQLite file and keyed by canonical form
+    of the puzzle (see gridops.canonical_forms), stored in that form too.
+    Puzzles are looked up in bulk, a chunk at a time, and only the ones not found
+    go to the solver. Every lookup marks the puzzle as used, so once the cache
+    grows over its size the least recently used solutions are dropped first.
+    New solutions are written by flush(), which also runs from close() and at exit.
+    """
+
+    def __init__(self, db_name=CACHE_NAME, size=CACHE_SIZE) -> None:
+        """
+        Opens the cache file, creating the table if there is none.
+
+        :param db_name: Name of cache database file
+        :param size: How many solutions are kept at most
+        """
+
+        self.db_conn = sqlite3.connect(db_name)
+        self.cursor = self.db_conn.cursor()
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        self.cursor.execute("PRAGMA synchronous = NORMAL")
+        self.cursor.execute(
+            """CREATE TABLE IF NOT EXISTS solutions(
+            puzzle TEXT PRIMARY KEY,
+            solution TEXT,
+            last_used INTEGER)"""
+        )
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions(last_used)"
+        )
+        self.cursor.execute("SELECT count(*) FROM solutions")
+        self.stored = self.cursor.fetchone()[0]
+        self.size = size
+        self.hits = 0
+        self.rows = []
+        atexit.register(self.close)
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def lookup(self, puzzles: list[str]) -> dict[str, str]:
+        """
+        Looks puzzles up with one query and marks the ones found as just used.
+
+        :param puzzles: Puzzle strings, no more than CACHE_CHUNK of them
+        :return: Solutions found, keyed by puzzle
+        :rtype: dict
+        """
+
+        marks = ",".join("?" * len(puzzles))
+        self.cursor.execute(
+            f"SELECT puzzle, solution FROM solutions WHERE puzzle IN ({marks})",
+            puzzles,
+        )
+        found = dict(self.cursor.fetchall())
+        if found:
+            self.cursor.execute(
+                f"UPDATE solutions SET last_used = ? WHERE puzzle IN ({marks})",
+                (time.time_ns(), *puzzles),
+            )
+        return found
+
+    def store(self, puzzle: str, solution: str) -> None:
+        """
+        Adds a solution to the buffer, writing the buffer out when it's full.
+
+        :param puzzle: Puzzle string
+        :param solution: Solution string
+        """
+
+        self.rows.append((puzzle, solution, time.time_ns()))
+        if len(self.rows) >= CACHE_CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered solutions to the cache, then drops the least recently used ones
+        if there are more than the cache size.
+        """
+
+        self.cursor.executemany(
+            "INSERT OR IGNORE INTO solutions(puzzle, solution, last_used) VALUES(?,?,?)",
+            self.rows,
+        )
+        self.stored += max(self.cursor.rowcount, 0)
+        self.rows.clear()
+        if self.stored > self.size:
+            self.cursor.execute(
+                """DELETE FROM solutions WHERE puzzle IN
+                (SELECT puzzle FROM solutions ORDER BY last_used LIMIT ?)""",
+                (self.stored - self.size,),
+            )
+            self.stored = self.size
+        self.db_conn.commit()
+
+    def close(self) -> None:
+        """
+        Writes what's left in the buffer and closes the cache. Safe to call more than once.
+        """
+
+        if self.db_conn is None:
+            return
+        self.flush()
+        self.db_conn.close()
+        self.db_conn = None
+        atexit.unregister(self.close)
+
+    def stream(
+        self,
+        entries: collections.abc.Iterable[dict],
+        solve: collections.abc.Callable,
+    ) -> collections.abc.Iterator[
+        tuple[dict, bytearray, bool | None, int | str, tuple | None]
+    ]:
+        """
+        Caching stage of the streaming pipeline. Puzzles are looked up by canonical form,
+        so relabeled, transposed or reordered variants share one solution. Puzzles found
+        in the cache, or seen earlier in the same run, are yielded with that solution
+        mapped back, the rest are solved by the solve stream and their solutions stored.
+        Results keep the order of the entries.
+
+        :param entries: Dicts containing sudoku data, puzzle under the "puzzle" key
+        :param solve: Takes an iterable of entries and yields them back with their results
+        :return: Entry, solved grid, solution status, solution count ("N/A")
+        and effort (see solvers.solve_stream), None for puzzles not solved
+        :rtype: Iterator of tuples
+        """
+
+        entries = iter(entries)
+        # Entries read so far with their canonical form, transform and cached solution
+        # (None if not found), and the ones not found which the solver hasn't taken yet.
+        pending = collections.deque()
+        waiting = collections.deque()
+        # Canonical forms sent to the solver: [entries waiting for the same form, result]
+        shared = {}
+
+        def read_chunk() -> bool:
+            chunk = [entry for _, entry in zip(range(CACHE_CHUNK), entries)]
+            if not chunk:
+                return False
+            # Solutions stored so far are written first, so they can be found already.
+            if self.rows:
+                self.flush()
+            forms = gridops.canonical_forms([entry["puzzle"] for entry in chunk])
+            found = self.lookup(list({form for form, _ in forms}))
+            for entry, (form, transform) in zip(chunk, forms):
+                solution = found.get(form)
+                pending.append((entry, form, transform, solution))
+                if solution is not None:
+                    continue
+                if form in shared:
+                    shared[form][0] += 1
+                else:
+                    shared[form] = [0, None]
+                    waiting.append(entry)
+            return True
+
+        def misses() -> collections.abc.Iterator[dict]:
+            while waiting or (len(pending) < CACHE_AHEAD and read_chunk()):
+                if waiting:
+                    yield waiting.popleft()
+
+        # A solver stream starts only when a puzzle is not found. Batches and workers
+        # read ahead of what is yielded here, so after a long run of found puzzles
+        # the stream ends and a new one takes the rest. Results still come in order.
+        results = None
+        while pending or read_chunk():
+            entry, form, transform, solution = pending.popleft()
+            if solution is not None:
+                self.hits += 1
+                solution = gridops.from_canonical(solution, transform)
+                yield entry, bytearray(solution, "ascii"), True, "N/A", None
+                continue
+            # Same form as a puzzle solved earlier in this run.
+            if shared[form][1] is not None:
+                shared[form][0] -= 1
+                solution, status = shared[form][1]
+                if not shared[form][0]:
+                    del shared[form]
+                self.hits += 1
+                solution = gridops.from_canonical(solution, transform)
+                yield entry, bytearray(solution, "ascii"), status, "N/A", None
+                continue
+            result = next(results, None) if results is not None else None
+            if result is None:
+                results = solve(misses())
+                result = next(results)
+            _, grid, status, _, _ = result
+            solution = gridops.to_canonical(grid.decode(), transform)
+            if status:
+                self.store(form, solution)
+            if shared[form][0]:
+                shared[form][1] = (solution, status)
+            else:
+                del shared[form]
+            yield result
+        if results is not None:
+            results.close()
 
 # def setup_path():
 #     main_dir = os.path.split(os.path.abspath(__file__))[0]
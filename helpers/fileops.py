@@ -1,116 +1,270 @@
+import numpy as np
 import tqdm
 
+import atexit
+import bz2
 import csv
 import datetime
+import gzip
+import itertools
+import lzma
+import mmap
 import os
+import random
+import sqlite3
+import struct
 import sys
+import time
 import typing
 
 import dbops
 import gridops
 import validateops
 
-
-def db_to_file(db_name: str) -> None:
+# Layout of the file is sniffed from its first HEAD_LINES lines.
+# Running share of bad rows is checked only after BAD_ROWS_SAMPLE rows were read.
+HEAD_LINES = 200
+BAD_ROWS_SAMPLE = 200
+
+# Line offset index kept next to the data file, see line_index().
+# It's built INDEX_BLOCK bytes at a time, and read INDEX_CHUNK rows at a time.
+INDEX_VERSION = 1
+INDEX_BLOCK = 1 << 24
+INDEX_CHUNK = 4096
+
+# Packed puzzle files, see pack_file(). A header (magic, version, flags, number of records)
+# is followed by records of PACK_CELLS bytes holding the puzzle as 4-bit cells,
+# and PACK_CELLS more for the solution when the PACK_SOLUTIONS flag is set.
+PACK_MAGIC = b"SDKP"
+PACK_VERSION = 1
+PACK_SOLUTIONS = 1
+PACK_HEADER = struct.Struct("<4sBBxxQ")
+PACK_CELLS = 41
+
+# Compressed files are recognised by magic bytes when read, and by extension when written.
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+COMPRESSION_OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+# DB contents go to DUMP_FILE, or to the dump of the day for new runs only,
+# read DUMP_CHUNK rows at a time.
+DUMP_FILE = "./dbdump.csv"
+DUMP_DATED = "./dbdump-{}.csv"
+DUMP_CHUNK = 10_000
+
+# Solver results go to RESULTS_FILE, written RESULTS_BATCH rows at a time.
+RESULTS_FILE = "./results.csv"
+RESULTS_BATCH = 1_000
+RESULTS_FIELDS = (
+    "date",
+    "time",
+    "method",
+    "puzzle",
+    "discoveredSolution",
+    "identical",
+    "providedSolution",
+    "solutions",
+)
+
+
+def db_to_file(db_conn: sqlite3.Connection, incremental=False) -> int:
     """
-    Saves DB contents into a csv file
-
-    :param db_name: Name of the db file for connection purposes
+    Saves DB contents into a csv file, streaming rows from the cursor in chunks.
+    Incremental export saves only runs added since the last incremental export,
+    appending them to the dump of the day.
+
+    :param db_conn: SQLite3 connection object kept open for the whole session
+    :param incremental: Whether only runs added since the last incremental export are saved
+    :return: Number of saved rows
+    :rtype: int
     """
 
-    cursor, db_conn = dbops.conn_to_db(db_name)
-    cursor.execute("SELECT * FROM statistics")
-    db = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM statistics")
-    names = list(map(lambda header: header[0], cursor.description))
-
-    # Combines names and values into a list of dicts
-    combined = [{key: val for key, val in zip(names, entry)} for entry in db]
-
-    # Write to file
-    f = open_file("./dbdump.csv", mode="w")
-    with f:
-        writer = csv.DictWriter(f, fieldnames=names)
-        writer.writeheader()
-        for row in tqdm.tqdm(combined, desc="Copying..."):
-            writer.writerow(
-                {
-                    names[0]: row[names[0]],
-                    names[1]: row[names[1]],
-                    names[2]: row[names[2]],
-                    names[3]: row[names[3]],
-                    names[4]: row[names[4]],
-                    names[5]: row[names[5]],
-                    names[6]: row[names[6]],
-                    names[7]: row[names[7]],
-                    names[8]: row[names[8]],
-                }
-            )
-    db_conn.close()
+    cursor = db_conn.cursor()
+    dbops.create_export_table(cursor)
+    watermark = 0
+    if incremental:
+        cursor.execute("SELECT run_id FROM export_watermark")
+        watermark = (cursor.fetchone() or (0,))[0]
+        filename = DUMP_DATED.format(datetime.date.today())
+    else:
+        filename = DUMP_FILE
+    # Runs are written when they finish, so rowid is the order they were added in.
+    cursor.execute(
+        "SELECT rowid, * FROM statistics WHERE rowid > ? ORDER BY rowid", (watermark,)
+    )
+    # Rowid is only needed for the watermark.
+    names = [header[0] for header in cursor.description][1:]
+    rows = cursor.fetchmany(DUMP_CHUNK)
+    if incremental and not rows:
+        return 0
+
+    # Dumps of the day get their header once.
+    header = (
+        not incremental or not os.path.exists(filename) or not os.stat(filename).st_size
+    )
+    last, saved = None, 0
+    f = open_file(filename, mode="a" if incremental else "w")
+    with f, tqdm.tqdm(desc="Copying...", unit=" rows") as progress:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(names)
+        while rows:
+            writer.writerows(row[1:] for row in rows)
+            last = rows[-1][0]
+            saved += len(rows)
+            progress.update(len(rows))
+            rows = cursor.fetchmany(DUMP_CHUNK)
+
+    if incremental:
+        cursor.execute("DELETE FROM export_watermark")
+        cursor.execute("INSERT INTO export_watermark(run_id) VALUES (?)", (last,))
+        db_conn.commit()
+
+    return saved
 
 
 def write_to_file(
-    sudoku_data: dict[str, str], grid: list, method_name, comparison=False
+    sudoku_data: dict[str, str],
+    grid: bytearray,
+    method_name,
+    comparison=False,
+    solution_count="N/A",
 ) -> None:
     """
     Writes a bunch of data to a file called "results.csv".
     Creates file if it doesn't exist, appends if it does.
+    Opens the file for a single row, use ResultsSink for a whole run.
 
     :param sudoku_data: A dict contain ing puzzle and/or solution provided for comparison
-    :param grid: A list of list representing generated sudoku solution
+    :param grid: A compact grid representing generated sudoku solution
     :param comparison: Result of comparison if generated solution is equivalent to provided one
     :param method_name: A string representing solve method name
+    :param solution_count: How many solutions were counted, up to the --count limit
     """
 
-    puzzle = sudoku_data["puzzle"]
-    solution_discovered = gridops.grid_to_str(grid)
+    with ResultsSink() as sink:
+        sink.write(sudoku_data, grid, method_name, comparison, solution_count)
 
-    # Check for solutions presence
-    if len(sudoku_data) == 2 and comparison:
-        solution_provided = sudoku_data["solution"]
-    else:
-        solution_provided = "N/A"
-    datetime_obj = datetime.datetime.now()
-    date = datetime_obj.date()
-    time = datetime_obj.time().strftime("%H:%M:%S")
 
-    # Open file, create variables and write to file using DictWriter.
-    f = open_file("./results.csv", mode="a")
-    with f:
-        fieldnames = [
-            "date",
-            "time",
-            "method",
-            "puzzle",
-            "discoveredSolution",
-            "identical",
-            "providedSolution",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-        # If we are at the beginning of the file, also write headers.
-        if f.tell() == 0:
-            writer.writeheader()
-        writer.writerow(
-            {
-                "date": date,
-                "time": time,
-                "method": method_name,
-                "puzzle": puzzle,
-                "discoveredSolution": solution_discovered,
-                "identical": comparison,
-                "providedSolution": solution_provided,
-            }
+class ResultsSink:
+    """
+    Keeps "results.csv" open for the whole run and writes rows in batches.
+    Results go through gzip, bz2 or xz when the file name ends with .gz, .bz2 or .xz.
+    Header is written only when the file is empty. A file with a different header,
+    left by an older version, is moved aside first (see rotated_name()).
+    Rows still in the buffer are written by close(), which also runs at exit,
+    so an interrupted run keeps everything solved so far.
+    """
+
+    def __init__(self, filename=RESULTS_FILE, batch_size=RESULTS_BATCH) -> None:
+        """
+        Opens the file for appending and writes the header if needed.
+
+        :param filename: filename or filepath of the results file
+        :param batch_size: How many rows are buffered before writing them to the file
+        """
+
+        # Rows must line up with the header, so a file of another layout is moved aside.
+        if validateops.validate_file(filename) and os.path.getsize(filename):
+            with open_file(filename) as f:
+                header = next(csv.reader(f), None)
+            if header != list(RESULTS_FIELDS):
+                os.replace(filename, rotated_name(filename))
+
+        # Compressed files append a new stream starting at 0, so size is checked instead.
+        new_file = not validateops.validate_file(filename) or not os.path.getsize(
+            filename
         )
+        self.file = open_file(filename, mode="a")
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(RESULTS_FIELDS)
+        self.batch_size = batch_size
+        self.rows = []
+        self.second = None
+        self.date = self.time = ""
+        atexit.register(self.close)
+
+    def __enter__(self) -> "ResultsSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(
+        self,
+        sudoku_data: dict[str, str],
+        grid: bytearray,
+        method_name,
+        comparison=False,
+        solution_count="N/A",
+    ) -> None:
+        """
+        Adds a row to the buffer, writing the buffer out when it's full.
+
+        :param sudoku_data: A dict containing puzzle and/or solution provided for comparison
+        :param grid: A compact grid representing generated sudoku solution
+        :param method_name: A string representing solve method name
+        :param comparison: Result of comparison if generated solution is equivalent to provided one
+        :param solution_count: How many solutions were counted, up to the --count limit
+        """
+
+        # Check for solutions presence
+        if len(sudoku_data) == 2 and comparison:
+            solution_provided = sudoku_data["solution"]
+        else:
+            solution_provided = "N/A"
+
+        # Date and time strings change once a second, no need to make them for every row.
+        second = int(time.time())
+        if second != self.second:
+            datetime_obj = datetime.datetime.fromtimestamp(second)
+            self.date = str(datetime_obj.date())
+            self.time = datetime_obj.time().strftime("%H:%M:%S")
+            self.second = second
+
+        self.rows.append(
+            (
+                self.date,
+                self.time,
+                method_name,
+                sudoku_data["puzzle"],
+                gridops.grid_to_str(grid),
+                comparison,
+                solution_provided,
+                solution_count,
+            )
+        )
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes buffered rows to the file.
+        """
 
+        self.writer.writerows(self.rows)
+        self.rows.clear()
+        self.file.flush()
 
-def read_file(file: str, solutions: bool) -> list[str]:
+    def close(self) -> None:
+        """
+        Writes what's left in the buffer and closes the file. Safe to call more than once.
+        """
+
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        atexit.unregister(self.close)
+
+
+def read_file(file: str, solutions: bool) -> list[dict[str, str]]:
     """
     Returns list of dicts with sudoku puzzles
     or puzzles and solutions pairs provided by the user.
     Solutions are provided by the user.
-    Output is going to be used to fed into the solver.
+    Whole file is read at once, stream_file() is used for solving.
 
     :param file: A string containing filename with extension or path to the file
     :param solutions: A boolean value depending on flag given by the user
@@ -118,59 +272,484 @@ def read_file(file: str, solutions: bool) -> list[str]:
     :rtype: list
     """
 
-    # Add rows (dicts) to puzzles list.
-    puzzles = []
+    return list(stream_file(file, solutions))
+
+
+def stream_file(file: str, solutions: bool) -> typing.Iterator[dict[str, str]]:
+    """
+    Yields dicts with sudoku puzzles or puzzles and solutions pairs one row at a time,
+    so solving starts right away and memory use doesn't depend on the file size.
+    Layout of the file is sniffed from HEAD_LINES lines read once from its head,
+    and the same lines are parsed before the rest of the file.
+    Packed files (see pack_file()) are recognised by their magic bytes.
+
+    :param file: A string containing filename with extension or path to the file
+    :param solutions: A boolean value depending on flag given by the user
+    :return: Dicts containing sudoku data. Puzzles and solutions or puzzles only
+    :rtype: Iterator of dicts
+    """
+
+    if is_packed(file):
+        yield from stream_packed(file, solutions)
+        return
     f = open_file(file)
     with f:
-        lines_read = 0
-        lines_valid = 0
-        bad = 0
+        head = list(itertools.islice(f, HEAD_LINES))
+        header, delimiter, blank = validateops.sniff_head(head, solutions)
+        lines = itertools.chain(head, f)
+
+        # First line is the header when solutions flag is False.
+        if not solutions:
+            next(lines, None)
+        yield from parse_lines(lines, solutions, header, delimiter, blank)
+
+
+def stream_lines(
+    file: str, solutions: bool, selection=slice(None), sample=0, seed=None
+) -> typing.Iterator[dict[str, str]]:
+    """
+    Yields dicts with sudoku data from chosen rows of a file only. The file is memory
+    mapped, and rows are found through the line offset index, so only the chosen rows
+    are read. Rows are counted from 0, not counting the header line.
+
+    :param file: A string containing filename with extension or path to the file
+    :param solutions: A boolean value depending on flag given by the user
+    :param selection: A slice of rows to read, like --range start:stop
+    :param sample: Read this many rows picked at random from the selection, 0 for all
+    :param seed: Seed for picking the sample
+    :return: Dicts containing sudoku data. Puzzles and solutions or puzzles only
+    :rtype: Iterator of dicts
+    """
+
+    if is_packed(file):
+        yield from stream_packed(file, solutions, selection, sample, seed)
+        return
+    if compression(file) is not None:
+        yield from stream_compressed_lines(file, solutions, selection, sample, seed)
+        return
+    offsets = line_index(file)
+    lines_total = len(offsets) - 1
+    if not lines_total:
+        return
+    with open(file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        head_end = int(offsets[min(HEAD_LINES, lines_total)])
+        head = mm[:head_end].decode("utf-8").splitlines(keepends=True)
+        header, delimiter, blank = validateops.sniff_head(head, solutions)
+        skip = 1 if not solutions or validateops.is_header(head[0]) else 0
+
+        rows = pick_rows(lines_total - skip, selection, sample, seed)
+        lines = (
+            mm[start:stop].decode("utf-8")
+            for chunk in chunked_rows(rows, skip)
+            for start, stop in zip(offsets[chunk].tolist(), offsets[chunk + 1].tolist())
+        )
+        yield from parse_lines(lines, solutions, header, delimiter, blank)
+
+
+def stream_compressed_lines(
+    file: str, solutions: bool, selection=slice(None), sample=0, seed=None
+) -> typing.Iterator[dict[str, str]]:
+    """
+    Yields dicts with sudoku data from chosen rows of a compressed file.
+    Compressed files can't be memory mapped, so lines are counted in one pass,
+    and the chosen rows are picked while reading through the file in a second one.
+
+    :param file: A string containing filename with extension or path to the file
+    :param solutions: A boolean value depending on flag given by the user
+    :param selection: A slice of rows to read, like --range start:stop
+    :param sample: Read this many rows picked at random from the selection, 0 for all
+    :param seed: Seed for picking the sample
+    :return: Dicts containing sudoku data. Puzzles and solutions or puzzles only
+    :rtype: Iterator of dicts
+    """
+
+    f = open_file(file)
+    with f:
+        lines_total = sum(1 for _ in f)
+    f = open_file(file)
+    with f:
+        head = list(itertools.islice(f, HEAD_LINES))
+        if not head:
+            return
+        header, delimiter, blank = validateops.sniff_head(head, solutions)
+        skip = 1 if not solutions or validateops.is_header(head[0]) else 0
+        rows = pick_rows(lines_total - skip, selection, sample, seed)
+        if not rows:
+            return
+        wanted = rows if isinstance(rows, range) else set(rows)
+        lines = itertools.islice(itertools.chain(head, f), skip, max(rows) + skip + 1)
+        lines = (line for row, line in enumerate(lines) if row in wanted)
+        yield from parse_lines(lines, solutions, header, delimiter, blank)
+
+
+def pick_rows(
+    rows_total: int, selection: slice, sample: int, seed
+) -> typing.Sequence[int]:
+    """
+    Returns numbers of rows chosen with --range and --sample, in file order.
+
+    :param rows_total: Number of rows in the file
+    :param selection: A slice of rows, like --range start:stop
+    :param sample: Pick this many rows at random from the selection, 0 for all
+    :param seed: Seed for picking the sample
+    :return: A range or a sorted list of row numbers
+    :rtype: range or list
+    """
+
+    rows = range(rows_total)[selection]
+    if sample:
+        rows = sorted(random.Random(seed).sample(rows, min(sample, len(rows))))
+
+    return rows
+
+
+def chunked_rows(rows: typing.Sequence[int], skip: int) -> typing.Iterator[np.ndarray]:
+    """
+    Turns row numbers into arrays of line numbers, INDEX_CHUNK at a time.
+
+    :param rows: Row numbers, header line not counted
+    :param skip: Number of header lines
+    :return: Arrays of line numbers
+    :rtype: Iterator of NumPy arrays
+    """
+
+    for start in range(0, len(rows), INDEX_CHUNK):
+        yield np.asarray(rows[start : start + INDEX_CHUNK], dtype=np.int64) + skip
+
+
+def line_index(file: str) -> np.ndarray:
+    """
+    Returns byte offsets of every line start in a file, followed by the file size.
+    Offsets are kept in a sidecar file next to the data file (file name + ".idx"),
+    and built again only when the data file's size or modification time changed.
+
+    :param file: A string containing filename with extension or path to the file
+    :return: An array of line start offsets, line i is offsets[i]:offsets[i + 1]
+    :rtype: NumPy array
+    """
+
+    stat = os.stat(file)
+    index_file = f"{file}.idx"
+    if validateops.validate_file(index_file) and os.path.getsize(index_file) > 24:
+        index = np.memmap(index_file, dtype=np.uint64, mode="r")
+        if (
+            len(index) > 3
+            and index[0] == INDEX_VERSION
+            and index[1] == stat.st_size
+            and index[2] == stat.st_mtime_ns
+        ):
+            return index[3:]
+
+    # Look for new lines a block at a time, so memory use doesn't depend on the file size.
+    ends = [np.zeros(1, dtype=np.uint64)]
+    if stat.st_size:
+        with open(file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, stat.st_size, INDEX_BLOCK):
+                    count = min(INDEX_BLOCK, stat.st_size - start)
+                    block = np.frombuffer(mm, dtype=np.uint8, count=count, offset=start)
+                    ends.append(
+                        np.flatnonzero(block == 10).astype(np.uint64) + start + 1
+                    )
+                    del block
+    ends.append(np.array([stat.st_size], dtype=np.uint64))
+    offsets = np.unique(np.concatenate(ends))
+
+    # No index is kept when it can't be written, it's only a cache.
+    header = np.array([INDEX_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.uint64)
+    try:
+        np.concatenate((header, offsets)).tofile(index_file)
+    except OSError:
+        pass
+
+    return offsets
+
+
+def parse_lines(
+    lines: typing.Iterable[str],
+    solutions: bool,
+    header: list[str],
+    delimiter: str,
+    blank: str,
+) -> typing.Iterator[dict[str, str]]:
+    """
+    Validates lines of a file and yields the valid ones as dicts.
+    Other delimiters and "." for free cells are turned into the "," and "0" used here.
+    Whole lines are validated and split by a single precompiled pattern,
+    csv module is used only for quoted lines.
+    Share of bad rows is checked as it goes,
+    and the program quits once more than 96% of rows turned out bad.
+
+    :param lines: Lines read from a file, header line excluded
+    :param solutions: A boolean value depending on flag given by the user
+    :param header: Header list from validateops.sniff_head()
+    :param delimiter: Delimiter from validateops.sniff_head()
+    :param blank: Free cell character from validateops.sniff_head()
+    :return: Dicts containing sudoku data. Puzzles and solutions or puzzles only
+    :rtype: Iterator of dicts
+    """
+
+    lines_read = 0
+    bad = 0
+
+    # How to act when solutions flag is True.
+    if solutions:
+        pair_pattern = validateops.PAIR_PATTERNS[header[0]]
+        advice = "Check it and try again."
+
+    # How to act when solutions flag is False.
+    else:
+        advice = "Probably you have solutions in your file. \nUse '-s' flag."
+    one_column = header == ["puzzle"]
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        lines_read += 1
+        if delimiter != ",":
+            line = line.replace(delimiter, ",")
+        if '"' in line:
+            line = ",".join(split_line(line))
+        if blank != "0":
+            line = line.replace(blank, "0")
+        if solutions:
+            match = pair_pattern.fullmatch(line)
+            if match is not None and "0" in match["puzzle"]:
+                yield match.groupdict()
+                continue
+        elif one_column and validateops.validate_puzzle(line):
+            yield {"puzzle": line}
+            continue
+        bad += 1
+
+        # Running ratio, so a broken file is refused without going through all of it.
+        if lines_read >= BAD_ROWS_SAMPLE and bad / lines_read > 0.96:
+            bad_data_exit(bad / lines_read, advice)
+    if lines_read and bad / lines_read > 0.96:
+        bad_data_exit(bad / lines_read, advice)
+
+
+def split_line(line: str) -> list[str]:
+    """
+    Splits a line of a csv file into fields. Quoted lines go through the csv module.
+
+    :param line: A line read from a file, without the new line character
+    :return: A list of fields
+    :rtype: list
+    """
+
+    if '"' in line:
+        return next(csv.reader([line]), [])
+    return line.split(",")
+
+
+def bad_data_exit(bad_ratio: float, advice: str) -> None:
+    """
+    Quits the program when too many rows of the file can't pass validation.
+
+    :param bad_ratio: Share of rows which can't pass validation
+    :param advice: What the user should check
+    """
+
+    sys.exit(
+        f"Your data is in mess...\n"
+        f"{bad_ratio: .0%} of your data can't pass validation.\n"
+        f"{advice}"
+    )
+
+
+def pack_file(source: str, target: str, solutions: bool) -> int:
+    """
+    Converts a csv/txt file into a packed file, which is read without any text parsing.
+    Every cell takes 4 bits, so a record is 41 bytes, or 82 bytes with the solution.
+    Only rows passing validation are packed.
+
+    :param source: A string containing filename or path to the csv/txt file
+    :param target: A string containing filename or path to the packed file
+    :param solutions: A boolean value depending on flag given by the user
+    :return: Number of packed puzzles
+    :rtype: int
+    """
+
+    # Opening the target empties it, so the source must not be the same file.
+    if os.path.abspath(source) == os.path.abspath(target) or (
+        os.path.exists(source)
+        and os.path.exists(target)
+        and os.path.samefile(source, target)
+    ):
+        sys.exit(f"Can't pack {source} into itself. Choose another file to pack into.")
+
+    count = 0
+    flags = PACK_SOLUTIONS if solutions else 0
+    rows = stream_file(source, solutions)
+    with open(target, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, flags, count))
+        while chunk := list(itertools.islice(rows, INDEX_CHUNK)):
+            blocks = [pack_grids([row["puzzle"] for row in chunk])]
+            if solutions:
+                blocks.append(pack_grids([row["solution"] for row in chunk]))
+            f.write(np.hstack(blocks).tobytes())
+            count += len(chunk)
+
+        # Number of records is known only at the end.
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, flags, count))
+
+    return count
+
+
+def stream_packed(
+    file: str, solutions: bool, selection=slice(None), sample=0, seed=None
+) -> typing.Iterator[dict[str, str]]:
+    """
+    Yields dicts with sudoku data from a packed file. Records are memory mapped
+    and unpacked with NumPy INDEX_CHUNK at a time. Records are all the same size,
+    so chosen rows are read straight away, no index is needed.
 
-        # How to act when solutions flag is True.
+    :param file: A string containing filename or path to the packed file
+    :param solutions: A boolean value depending on flag given by the user
+    :param selection: A slice of rows to read, like --range start:stop
+    :param sample: Read this many rows picked at random from the selection, 0 for all
+    :param seed: Seed for picking the sample
+    :return: Dicts containing sudoku data. Puzzles and solutions or puzzles only
+    :rtype: Iterator of dicts
+    """
+
+    records, has_solutions = load_packed(file)
+    if solutions and not has_solutions:
+        sys.exit(f"There are no solutions in {file}. Try again without '-s' flag.")
+    rows = pick_rows(len(records), selection, sample, seed)
+    bad = 0
+    for start in range(0, len(rows), INDEX_CHUNK):
+        chunk = records[np.asarray(rows[start : start + INDEX_CHUNK], dtype=np.int64)]
+        puzzles = unpack_grids(chunk[:, :PACK_CELLS])
+        valid = (puzzles <= 9).all(axis=1) & (puzzles == 0).any(axis=1)
+        puzzles = (puzzles + gridops.FREE).tobytes().decode("ascii")
         if solutions:
-            lines_loc = lines_positions(file)
-            header = validateops.determine_headers(file, lines_loc)
-            reader = csv.DictReader(f, fieldnames=header)
-            for row in reader:
-                lines_read += 1
-                validation = validateops.validate_rows(row, header, solutions)
-                if validation:
-                    lines_valid += 1
-                    puzzles.append(row)
-                if not validation:
-                    bad += 1
-            if bad / lines_read > 0.96:
-                sys.exit(
-                    f"Your data is in mess...\n"
-                    f"{bad/lines_read: .0%} of your data can't pass validation.\n"
-                    f"Check it and try again."
-                )
-
-        # How to act when solutions flag is False
-        else:
-            reader = csv.DictReader(f)
-            header = list(reader.fieldnames)
-            for row in reader:
-                lines_read += 1
-                validation = validateops.validate_rows(row, header, solutions)
-                if validation:
-                    puzzles.append(row)
-                    lines_valid += 1
-                if not validation:
-                    bad += 1
-            if bad / lines_read > 0.96:
-                sys.exit(
-                    f"Your data is in mess...\n"
-                    f"{bad/lines_read: .0%} of your data can't pass validation.\n"
-                    f"Probably you have solutions in your file. \nUse '-s' flag."
-                )
-
-    return puzzles
+            grids = unpack_grids(chunk[:, PACK_CELLS:])
+            valid &= ((grids >= 1) & (grids <= 9)).all(axis=1)
+            grids = (grids + gridops.FREE).tobytes().decode("ascii")
+        bad += len(chunk) - int(valid.sum())
+        for i in np.flatnonzero(valid).tolist():
+            if solutions:
+                yield {
+                    "puzzle": puzzles[i * 81 : i * 81 + 81],
+                    "solution": grids[i * 81 : i * 81 + 81],
+                }
+            else:
+                yield {"puzzle": puzzles[i * 81 : i * 81 + 81]}
+    if rows and bad / len(rows) > 0.96:
+        bad_data_exit(bad / len(rows), "Packed file is damaged, pack it again.")
+
+
+def load_packed(file: str) -> tuple[np.ndarray, bool]:
+    """
+    Returns records of a packed file as a memory mapped NumPy array, no data is copied.
+    Each row is a record, first PACK_CELLS bytes are the puzzle, the rest the solution.
+
+    :param file: A string containing filename or path to the packed file
+    :return: Array of records, and True if records contain solutions
+    :rtype: tuple
+    """
+
+    with open(file, "rb") as f:
+        magic, version, flags, count = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+    if version != PACK_VERSION:
+        sys.exit(f"Packed file version {version} isn't supported. Pack it again.")
+    has_solutions = bool(flags & PACK_SOLUTIONS)
+    record = PACK_CELLS * (2 if has_solutions else 1)
+    if not count:
+        return np.zeros((0, record), dtype=np.uint8), has_solutions
+    try:
+        records = np.memmap(
+            file,
+            dtype=np.uint8,
+            mode="r",
+            offset=PACK_HEADER.size,
+            shape=(count, record),
+        )
+    except ValueError:
+        sys.exit(f"Packed file {file} is cut short. Pack it again.")
+
+    return records, has_solutions
+
+
+def pack_grids(grids: list[str]) -> np.ndarray:
+    """
+    Packs 81 digit strings into 41 bytes each, two cells per byte.
+
+    :param grids: A list of 81 character strings of digits
+    :return: An array of packed grids, one per row
+    :rtype: NumPy array
+    """
+
+    digits = np.zeros((len(grids), 82), dtype=np.uint8)
+    digits[:, :81] = (
+        np.frombuffer("".join(grids).encode("ascii"), dtype=np.uint8).reshape(-1, 81)
+        - gridops.FREE
+    )
+
+    return (digits[:, 0::2] << 4) | digits[:, 1::2]
+
+
+def unpack_grids(packed: np.ndarray) -> np.ndarray:
+    """
+    Unpacks grids packed by pack_grids() into 81 cell values each.
+
+    :param packed: An array of packed grids, one per row
+    :return: An array of cell values from 0 to 15, one grid per row
+    :rtype: NumPy array
+    """
+
+    digits = np.empty((len(packed), 82), dtype=np.uint8)
+    digits[:, 0::2] = packed >> 4
+    digits[:, 1::2] = packed & 15
+
+    return digits[:, :81]
+
+
+def is_packed(file: str) -> bool:
+    """
+    Checks if a file is a packed puzzle file by its magic bytes.
+
+    :param file: A string containing filename or path to the file
+    :return: True if file starts with PACK_MAGIC
+    :rtype: bool
+    """
+
+    try:
+        with open(file, "rb") as f:
+            return f.read(len(PACK_MAGIC)) == PACK_MAGIC
+    except OSError:
+        return False
+
+
+def rotated_name(filename: str) -> str:
+    """
+    Makes a free name for moving an old file aside, stamped with its last change,
+    so "results.csv.gz" becomes "results-20261018-120000.csv.gz".
+
+    :param filename: filename or filepath of an existing file
+    :return: Path of the same directory not taken by any file
+    :rtype: str
+    """
+
+    directory, name = os.path.split(filename)
+    stem, dot, extensions = name.partition(".")
+    stamp = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
+    stamp = stamp.strftime("%Y%m%d-%H%M%S")
+    for number in itertools.count():
+        suffix = f"-{number}" if number else ""
+        rotated = os.path.join(directory, f"{stem}-{stamp}{suffix}{dot}{extensions}")
+        if not os.path.exists(rotated):
+            return rotated
 
 
 def open_file(filename: str, mode="r") -> typing.IO:
     """
     Opens the file of given name or path.
+    Gzip, bz2 and xz files are decompressed, or compressed, on the fly.
 
     :param filename: filename or filepath
     :param mode: File open mode. Here read mode.
@@ -179,55 +758,38 @@ def open_file(filename: str, mode="r") -> typing.IO:
     :rtype: file object
     """
 
+    kind = compression(filename, mode)
     try:
-        f = open(filename, mode, newline="", encoding="utf-8")
+        if kind is None:
+            f = open(filename, mode, newline="", encoding="utf-8")
+        else:
+            f = COMPRESSION_OPENERS[kind](
+                filename, f"{mode}t", newline="", encoding="utf-8"
+            )
     except IOError as e:
         sys.exit(f"I/O error occurred: {os.strerror(e.errno)}")
 
     return f
 
 
-def lines_positions(file: str) -> list[int]:
-    """
-    Returns a list with 200 new line locations from a file. Uses tell() function
-    If file has less lines stops at file end.
-
-    :param file: filename or filepath as a str
-    :raise IOError: If something's wrong with the file
-    :return: A list composed of new line starting locations as int
-    :rtype: list
-    """
-
-    f = open_file(file)
-    with f:
-        lines_loc = []
-        lines = 0
-        while lines < 200:
-            line = f.readline()
-            if not line:
-                break
-            lines += 1
-            pos = f.tell()
-            lines_loc.append(pos)
-
-    return lines_loc
-
-
-def linesread(file: str, line_loc: int) -> str:
+def compression(filename: str, mode="r") -> str | None:
     """
-    Returns line read from a file to help determine which column is the puzzle,
-    and which is the solution.
+    Returns compression of a file: "gzip", "bz2", "xz" or None for plain files.
+    Files to be read are recognised by their magic bytes,
+    files to be written (or not there yet) by extension.
 
-    :param file: filename or filepath as a str
-    :param line_loc: Integer number of byte position for a given line
-    :raise IOError: If something's wrong with the file
-    :return: A string containing puzzle and solution separated with comma
-    :rtype: str
+    :param filename: filename or filepath
+    :param mode: File open mode
+    :return: Compression name or None value
+    :rtype: str or None value
     """
 
-    f = open_file(file)
-    with f:
-        f.seek(line_loc)
-        line = f.readline().strip()
+    if "r" in mode and validateops.validate_file(filename):
+        with open(filename, "rb") as f:
+            start = f.read(6)
+        for magic, kind in COMPRESSION_MAGIC.items():
+            if start.startswith(magic):
+                return kind
+        return None
 
-    return line
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(filename)[1])
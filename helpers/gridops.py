@@ -1,42 +1,144 @@
 import numpy as np
 
+import itertools
 
-def print_grid(grid: list[list[str]]) -> object:
+# Compact grid is a bytearray of 81 ASCII digits, row after row. FREE marks empty cells.
+FREE = ord("0")
+
+# Symmetries used for canonical forms: band order, stack order and transposition.
+# Cell k of a transformed grid is taken from cell TRANSFORMS[t, k] of the original.
+LINE_ORDERS = [
+    [block * 3 + line for block in blocks for line in range(3)]
+    for blocks in itertools.permutations(range(3))
+]
+TRANSFORMS = np.array(
+    [
+        np.arange(81).reshape(9, 9)[np.ix_(rows, cols)].transpose(axes).ravel()
+        for axes in ((0, 1), (1, 0))
+        for rows in LINE_ORDERS
+        for cols in LINE_ORDERS
+    ]
+)
+INVERSE_TRANSFORMS = TRANSFORMS.argsort(axis=1)
+# Transforms padded to whole bytes with an always empty cell, for packing clue masks.
+MASK_TRANSFORMS = np.pad(TRANSFORMS, ((0, 0), (0, 7)), constant_values=81)
+DIGITS = b"123456789"
+
+
+def print_grid(grid: bytearray) -> object:
     """
     returns grid using NumPy matrix method
 
-    :param grid: List of list representing sudoku puzzle
+    :param grid: A compact grid representing sudoku puzzle
     :return: A grid being a NumPy object
     :rtype: numpy matrix object
     """
 
-    return np.matrix(grid)
+    return np.matrix([list(grid[row * 9 : row * 9 + 9].decode()) for row in range(9)])
 
 
-def make_grid(entry: dict[str, str]) -> list[list[str]]:
+def make_grid(entry: dict[str, str]) -> bytearray:
     """
     Takes a dict as an input.
-    Manipulates a string and creates a 9x9 grid out of it.
-    The grid is a list of list made of 9 rows with 9 separated string chars inside.
+    Creates a compact grid out of the puzzle string.
+    The grid is a bytearray of 81 digits, row after row, so cell (row, col) is at row * 9 + col.
+    Copies for branching are cheap, and solvers don't need any int to str conversions.
 
 
     :param entry: A string containing sudoku puzzle to solve
-    :return: A list of lists (2d grid) with strings inside
-    :rtype: list
+    :return: A bytearray (flat 9x9 grid) with ASCII digits inside
+    :rtype: bytearray
     """
 
-    line = entry.get("puzzle")
-    return [[char for char in line[i * 9: (i + 1) * 9]] for i in range(9)]
+    return bytearray(entry.get("puzzle"), "ascii")
 
 
-def grid_to_str(grid: list[list[str]]) -> str:
+def grid_to_str(grid: bytearray) -> str:
     """
     Creates string form of a grid ready for writing to a file,
     or comparison with provided dataset.
 
-    :param grid: A list of list representing sudoku puzzle
-    :return: A string concatenated from the grid
+    :param grid: A compact grid representing sudoku puzzle
+    :return: A string made of the grid
+    :rtype: str
+    """
+
+    return grid.decode()
+
+
+def canonical_forms(puzzles: list[str]) -> list[tuple[str, tuple[int, bytes]]]:
+    """
+    Maps puzzles to representatives of their classes, so puzzles differing only
+    by relabeled digits, transposition, or order of bands and stacks get the same form.
+    Every puzzle is transformed 72 ways, those with the smallest mask of given cells
+    are relabeled in order of first appearance, and the smallest string wins.
+    Masks are compared for all puzzles at once with NumPy.
+
+    :param puzzles: Puzzle strings, 81 ASCII digits each
+    :return: Canonical puzzle and transform (index in TRANSFORMS, digits in order of labels)
+    :rtype: list of tuples
+    """
+
+    grids = np.frombuffer("".join(puzzles).encode(), dtype=np.uint8).reshape(-1, 81)
+    given = np.zeros((len(grids), 82), dtype=bool)
+    given[:, :81] = grids != FREE
+    masks = np.packbits(given[:, MASK_TRANSFORMS]).view("S11").reshape(-1, 72)
+    smallest = masks[np.arange(len(grids)), masks.argmin(axis=1)]
+    # Symmetric puzzles may tie on the mask, every tied transform is relabeled.
+    rows, transforms = np.nonzero(masks == smallest[:, None])
+    variants = grids[rows[:, None], TRANSFORMS[transforms]]
+
+    forms = [None] * len(grids)
+    for row, transform, variant in zip(rows.tolist(), transforms.tolist(), variants):
+        variant = variant.tobytes()
+        order = bytes(dict.fromkeys(variant.replace(b"0", b"")))
+        order += bytes(digit for digit in DIGITS if digit not in order)
+        form = variant.translate(bytes.maketrans(order, DIGITS)).decode()
+        if forms[row] is None or form < forms[row][0]:
+            forms[row] = (form, (transform, order))
+
+    return forms
+
+
+def canonical_form(puzzle: str) -> tuple[str, tuple[int, bytes]]:
+    """
+    Canonical form of a single puzzle, see canonical_forms.
+
+    :param puzzle: Puzzle string, 81 ASCII digits
+    :return: Canonical puzzle and transform mapping the puzzle onto it
+    :rtype: tuple
+    """
+
+    return canonical_forms([puzzle])[0]
+
+
+def to_canonical(grid: str, transform: tuple[int, bytes]) -> str:
+    """
+    Applies a transform to a grid, mapping a solution of a puzzle
+    onto a solution of its canonical form.
+
+    :param grid: Grid string of the puzzle the transform was made for
+    :param transform: Transform returned with the canonical form
+    :return: Transformed grid string
+    :rtype: str
+    """
+
+    index, order = transform
+    cells = np.frombuffer(grid.encode(), dtype=np.uint8)[TRANSFORMS[index]]
+    return cells.tobytes().translate(bytes.maketrans(order, DIGITS)).decode()
+
+
+def from_canonical(grid: str, transform: tuple[int, bytes]) -> str:
+    """
+    Reverses a transform, mapping a solution of the canonical form
+    back onto a solution of the puzzle the transform was made for.
+
+    :param grid: Grid string in canonical form
+    :param transform: Transform returned with the canonical form
+    :return: Grid string of the original puzzle
     :rtype: str
     """
 
-    return "".join([val for row in grid for val in row])
+    index, order = transform
+    cells = np.frombuffer(grid.encode(), dtype=np.uint8)[INVERSE_TRANSFORMS[index]]
+    return cells.tobytes().translate(bytes.maketrans(DIGITS, order)).decode()
@@ -14,11 +14,11 @@ def clear_screen():
         _ = os.system("clear")
 
 
-def compare(grid: list[list[str]], sol_str: dict[str]) -> bool:
+def compare(grid: bytearray, sol_str: dict[str]) -> bool:
     """
     Compares generated solution to the solution provided via file by the user
 
-    :param grid: A list of list representing generated sudoku solution
+    :param grid: A compact grid representing generated sudoku solution
     :param sol_str: A string with provided solution to given puzzle for comparison
     :return: True or false
     :rtype: bool
@@ -27,6 +27,21 @@ def compare(grid: list[list[str]], sol_str: dict[str]) -> bool:
     return gridops.grid_to_str(grid) == sol_str["solution"]
 
 
+def parse_range(text: str) -> slice:
+    """
+    Turns a "start:stop" string into a slice. Both ends can be left out or negative,
+    just like in Python slicing.
+
+    :param text: A string like "1000:2000", ":500" or "-100:"
+    :raise ValueError: If text isn't two integers (or nothing) separated by a colon
+    :return: A slice of rows
+    :rtype: slice
+    """
+
+    start, stop = text.split(":")
+    return slice(int(start) if start else None, int(stop) if stop else None)
+
+
 def cwd_main_dir():
     """
     Sets new cwd.
@@ -28,6 +28,7 @@ Choose what you want to do:
     1. Drop a record.
     2. Drop the table.
     3. Save DB to file.
+    4. Save new rows to file of the day.
 
     0. Exit program
     B. Get back to previous menu
@@ -47,12 +48,30 @@ Choose what you want to do:
     3. Show stats for given solve method only.
     4. Show stats for given date.
     5. Other actions.
+    6. Reports.
 
     0. Exit program.
     """
     )
 
 
+def print_reports_menu() -> None:
+    """
+    Reports menu
+    """
+    print(
+        """
+Choose report to display:
+    1. Latency and throughput by solve method.
+    2. Latency and throughput by solve method for a date range.
+    3. Compare two runs.
+
+    0. Exit program
+    B. Get back to previous menu
+    """
+    )
+
+
 def print_presentation_method_menu() -> None:
     """
     Presentation by method menu
@@ -82,6 +101,10 @@ Choose solve method to display stats for:
     3. DLXSudoku.
     4. Random walk.
     5. Cake Algorithm.
+    6. Bitmask CP.
+    7. Iterative R&B.
+    8. Algorithm X.
+    9. NumPy batch.
 
     0. Exit program
     B. Get back to previous menu
@@ -89,16 +112,17 @@ Choose solve method to display stats for:
     )
 
 
-def print_date() -> str:
+def print_date(label="date") -> str:
     """
     Returns valid date string if input matches the pattern and adopted conventions for dates.
 
+    :param label: What the date is for, shown in the prompt
     :return: A date entered by the user after validation.
     """
 
     miscellaneous.clear_screen()
     while True:
-        picked_date = input("\nEnter date in format YYYY-MM-DD\n\n>>> ")
+        picked_date = input(f"\nEnter {label} in format YYYY-MM-DD\n\n>>> ")
         validation = validateops.validate_date(picked_date)
         miscellaneous.clear_screen()
         if validation:
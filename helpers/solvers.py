@@ -1,29 +1,89 @@
 from dlxsudoku import Sudoku
+import numpy as np
 
+import array
+import collections
+import collections.abc
+import concurrent.futures
+import itertools
 import random
+import time
 
 import gridops
 
-
-def cake_algo(grid: list[list[str]]) -> str:
+# Compact grids are indexed by flat cell number row * 9 + col.
+# Everything below is computed once at import, so solvers only look things up.
+FREE = gridops.FREE
+ALL_DIGITS = 0x1FF
+ROW_OF = tuple(cell // 9 for cell in range(81))
+COL_OF = tuple(cell % 9 for cell in range(81))
+BOX_OF = tuple((cell // 27) * 3 + (cell % 9) // 3 for cell in range(81))
+
+# 27 units: rows 0-8, columns 9-17, 3x3 squares 18-26.
+UNITS = tuple(
+    tuple(cell for cell in range(81) if lookup[cell] == index)
+    for lookup in (ROW_OF, COL_OF, BOX_OF)
+    for index in range(9)
+)
+UNITS_OF = tuple(
+    (ROW_OF[cell], 9 + COL_OF[cell], 18 + BOX_OF[cell]) for cell in range(81)
+)
+
+# 20 cells sharing a row, column or square with each cell.
+PEERS = tuple(
+    tuple(
+        sorted(
+            {peer for unit in UNITS_OF[cell] for peer in UNITS[unit] if peer != cell}
+        )
+    )
+    for cell in range(81)
+)
+DIGITS = b"123456789"
+
+# Index arrays for vectorised unit lookups in numpy_batch_solve().
+ROW_IDX = np.array(ROW_OF)
+COL_IDX = np.array(COL_OF) + 9
+BOX_IDX = np.array(BOX_OF) + 18
+UNIT_IDX = np.array(UNITS)
+POPCOUNT = np.array([mask.bit_count() for mask in range(512)], dtype=np.uint8)
+BIT_DIGIT = np.array(
+    [mask.bit_length() if mask.bit_count() == 1 else 0 for mask in range(512)],
+    dtype=np.uint8,
+)
+
+# Random walk restarts after RESTART_NODES placements, doubling it every restart.
+# Time budget is checked every WALK_SLICE placements.
+RESTART_NODES = 1_000
+WALK_SLICE = 250
+
+# Exact cover matrix for Algorithm X, built once per process by exact_cover_matrix().
+EXACT_COVER = {}
+
+# Worker processes get puzzles in chunks of CHUNK_SIZE,
+# with at most CHUNKS_PER_JOB chunks per worker waiting in the pool.
+CHUNK_SIZE = 256
+CHUNKS_PER_JOB = 2
+# Batch solvers in a single process get BATCH_SIZE puzzles at a time.
+BATCH_SIZE = 4096
+
+
+def cake_algo(grid: bytearray) -> str:
     """
     If you do this test calculation, You get a CAKE!
 
-    :param grid: A list of list representing sudoku puzzle
+    :param grid: A compact grid representing sudoku puzzle
     :return: A string containing life thoughts.
     :rtype: str
     """
 
-    # Cake is cake :)
-    strings = ["THERE", "IS", "NO", "CAKE‼"]
-    for row in range(9):
-        for col in range(9):
-            grid[row][col] = " "
+    # Cake is cake :) Compact grid holds single bytes, so it's a plain "!" in there.
+    strings = [b"THERE", b"IS", b"NO", b"CAKE!"]
+    grid[:] = b" " * 81
     col = 1
     row = 1
     for string in strings:
         for char in string:
-            grid[row][col] = char
+            grid[row * 9 + col] = char
             col += 1
         row += 1
         if row == 2:
@@ -38,288 +98,1268 @@ def cake_algo(grid: list[list[str]]) -> str:
     return "The cake is a LIE‼"
 
 
-def random_walk(grid: list[list[str]]) -> bool:
+def random_walk(
+    grid: bytearray,
+    rng: random.Random = None,
+    max_nodes=0,
+    time_limit=0.0,
+    effort: dict[str, int] = None,
+) -> bool | None:
     """
     Made in association with CS50 Duck debugger. It solves, but its random...
-    Sometimes it gets stuck, sometimes it takes some time to solve,
-    and sometimes its solves the problem quite fast (rarely)...
+    Tries valid values only, in shuffled order, on the explicit stack engine.
+    When a walk gets stuck for too long it starts over with a new shuffle,
+    and it gives up when node or time budget for the puzzle runs out.
+    Algorithm writes values to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param rng: A random.Random instance, seed it for repeatable walks
+    :param max_nodes: Number of placements after which the walk gives up, 0 for no limit
+    :param time_limit: Seconds after which the walk gives up, 0 for no limit
+    :param effort: A dict counting nodes, backtracks and validator calls, if given
+    :return: True if solved, False if there is no solution, None if out of budget
+    :rtype: bool or None
+    """
 
-    :param grid: A list of list representing sudoku puzzle
-    :return: A boolean value for indication if there is a solution or not
+    # It's too random... but not endless anymore.
+    rng = rng or random.Random()
+    puzzle = grid[:]
+    free_fields = list_of_free_fields(grid)
+    valid_vals = scan_for_valid_vals(grid)
+    if not all(valid_vals.values()):
+        return False
+    deadline = time.perf_counter() + time_limit
+    nodes = 0
+    restart_after = RESTART_NODES
+    while True:
+        for vals in valid_vals.values():
+            rng.shuffle(vals)
+        grid[:] = puzzle
+        stack = array.array("b", [0])
+        walked = 0
+        status = None
+        while status is None and walked < restart_after:
+            if (max_nodes and nodes >= max_nodes) or (
+                time_limit and time.perf_counter() > deadline
+            ):
+                grid[:] = puzzle
+                return None
+            steps = min(WALK_SLICE, max_nodes - nodes) if max_nodes else WALK_SLICE
+            status = stack_solve(grid, free_fields, valid_vals, stack, steps, effort)
+            walked += steps
+            nodes += steps
+
+        # Solved, or every shuffled value was tried, which proves there is no solution.
+        if status is not None:
+            return status
+        restart_after *= 2
+
+
+def dlxsudoku_module(grid: bytearray) -> bool:
+    """
+    Sudoku solver found on PyPl using induction, Dancing Links and brute force.
+    https://pypi.org/project/dlxsudoku/
+    Solution is written to the grid which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :return: Boolean value indicating if solution was found or not
     :rtype: bool
     """
 
-    # It's too random...
-    to_check = find_empty(grid)
-    if not to_check:
-        return True
-    row, col = to_check
-    tried_vals = set()
-    possible = True
-    while possible:
-        num = random.randint(1, 9)
-        tried_vals.add(num)
-        if len(tried_vals) >= 9:
-            possible = False
-        if validator(grid, str(num), to_check):
-            grid[row][col] = str(num)
-            if random_walk(grid):
-                return True
-            grid[row][col] = "0"
+    # Create an object and call methods
+    s1 = Sudoku(grid.decode())
+    s1.solve()
+    grid[:] = s1.to_oneliner().encode()
 
-    return False
+    return FREE not in grid
 
 
-def dlxsudoku_module(data: dict[str]) -> list[list[str]]:
+def bitmask_solve(grid: bytearray, effort: dict[str, int] = None) -> bool:
     """
-    Sudoku solver found on PyPl using induction, Dancing Links and brute force.
-    https://pypi.org/project/dlxsudoku/
+    Constraint propagation solver keeping 9-bit masks of used digits for every row,
+    column and 3x3 square. Naked and hidden singles are placed until nothing changes,
+    then the cell with the fewest candidates is branched on.
+    Algorithm writes values to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param effort: A dict counting nodes and backtracks, if given
+    :return: Boolean value indicating if solution was found or not
+    :rtype: bool
+    """
+
+    return bitmask_count(grid, 1, effort) > 0
 
-    :param data: Raw sudoku data containing puzzle and/or solution
-    :return: Grid containing solution to given sudoku puzzle
+
+def bitmask_count(grid: bytearray, limit: int, effort: dict[str, int] = None) -> int:
+    """
+    Counts solutions with the bitmask solver, stopping as soon as limit is reached.
+    Limit of 2 is enough to tell a unique solution from many.
+    First solution found is written to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param limit: Stop counting after this many solutions
+    :param effort: A dict counting nodes and backtracks, if given
+    :return: Number of solutions found, never more than limit
+    :rtype: int
+    """
+
+    # Digit d is stored as bit (1 << d - 1) in the masks.
+    cells = [value - FREE for value in grid]
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for cell, digit in enumerate(cells):
+        if not digit:
+            continue
+        bit = 1 << (digit - 1)
+        row, col, box = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+        if (rows[row] | cols[col] | boxes[box]) & bit:
+            return 0
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
+
+    found = bitmask_search(cells, rows, cols, boxes, limit, effort)
+    if found:
+        grid[:] = bytes(digit + FREE for digit in cells)
+
+    return found
+
+
+def bitmask_search(
+    cells: list[int],
+    rows: list[int],
+    cols: list[int],
+    boxes: list[int],
+    limit=1,
+    effort: dict[str, int] = None,
+) -> int:
+    """
+    Recursive part of the bitmask solver. Propagates singles, then tries every candidate
+    of the most constrained cell on copies of the state, until limit solutions are found.
+    The first solved state is copied back into the lists given as arguments.
+
+    :param cells: A list of 81 ints, 0 marking a free cell
+    :param rows: A list of 9 bit masks of digits used in each row
+    :param cols: A list of 9 bit masks of digits used in each column
+    :param boxes: A list of 9 bit masks of digits used in each 3x3 square
+    :param limit: Stop searching after this many solutions
+    :param effort: A dict counting nodes and backtracks, if given,
+    a node is a call and a backtrack is a call which found nothing
+    :return: Number of solutions found, never more than limit
+    :rtype: int
+    """
+
+    if effort is not None:
+        effort["nodes"] += 1
+    if not propagate_singles(cells, rows, cols, boxes):
+        if effort is not None:
+            effort["backtracks"] += 1
+        return 0
+
+    # Minimum remaining values. Two candidates is as good as it gets after propagation.
+    best_cell = -1
+    best_count = 10
+    for cell in range(81):
+        if cells[cell]:
+            continue
+        free = ALL_DIGITS & ~(
+            rows[ROW_OF[cell]] | cols[COL_OF[cell]] | boxes[BOX_OF[cell]]
+        )
+        count = free.bit_count()
+        if count < best_count:
+            best_cell, best_count = cell, count
+            if count == 2:
+                break
+    if best_cell < 0:
+        return 1
+
+    # Later branches copy the state from before branching, so the solution waits.
+    row, col, box = ROW_OF[best_cell], COL_OF[best_cell], BOX_OF[best_cell]
+    free = ALL_DIGITS & ~(rows[row] | cols[col] | boxes[box])
+    found = 0
+    solved = None
+    while free and found < limit:
+        bit = free & -free
+        free ^= bit
+        t_cells, t_rows, t_cols, t_boxes = cells[:], rows[:], cols[:], boxes[:]
+        t_cells[best_cell] = bit.bit_length()
+        t_rows[row] |= bit
+        t_cols[col] |= bit
+        t_boxes[box] |= bit
+        count = bitmask_search(t_cells, t_rows, t_cols, t_boxes, limit - found, effort)
+        if count and solved is None:
+            solved = t_cells, t_rows, t_cols, t_boxes
+        found += count
+    if solved is not None:
+        cells[:], rows[:], cols[:], boxes[:] = solved
+    elif effort is not None:
+        effort["backtracks"] += 1
+
+    return found
+
+
+def propagate_singles(
+    cells: list[int], rows: list[int], cols: list[int], boxes: list[int]
+) -> bool:
+    """
+    Places naked singles (cell with one candidate left) and hidden singles
+    (digit with one place left in a row, column or square) until no more can be found.
+    Lists given as arguments are updated in place.
+
+    :param cells: A list of 81 ints, 0 marking a free cell
+    :param rows: A list of 9 bit masks of digits used in each row
+    :param cols: A list of 9 bit masks of digits used in each column
+    :param boxes: A list of 9 bit masks of digits used in each 3x3 square
+    :return: False if a contradiction was found, True otherwise
+    :rtype: bool
+    """
+
+    progress = True
+    while progress:
+        progress = False
+
+        # Naked singles
+        for cell in range(81):
+            if cells[cell]:
+                continue
+            row, col, box = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+            free = ALL_DIGITS & ~(rows[row] | cols[col] | boxes[box])
+            if not free:
+                return False
+            if not free & (free - 1):
+                cells[cell] = free.bit_length()
+                rows[row] |= free
+                cols[col] |= free
+                boxes[box] |= free
+                progress = True
+        if progress:
+            continue
+
+        # Hidden singles. Digits seen once in a unit are the ones to place.
+        for unit in UNITS:
+            used = seen_once = seen_more = 0
+            for cell in unit:
+                if cells[cell]:
+                    used |= 1 << (cells[cell] - 1)
+                    continue
+                free = ALL_DIGITS & ~(
+                    rows[ROW_OF[cell]] | cols[COL_OF[cell]] | boxes[BOX_OF[cell]]
+                )
+                seen_more |= seen_once & free
+                seen_once |= free
+            if (used | seen_once) != ALL_DIGITS:
+                return False
+            singles = seen_once & ~seen_more
+            if not singles:
+                continue
+            for cell in unit:
+                if cells[cell]:
+                    continue
+                row, col, box = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+                hit = singles & ~(rows[row] | cols[col] | boxes[box])
+                if not hit:
+                    continue
+                if hit & (hit - 1):
+                    return False
+                cells[cell] = hit.bit_length()
+                rows[row] |= hit
+                cols[col] |= hit
+                boxes[box] |= hit
+                progress = True
+
+    return True
+
+
+def exact_cover_solve(grid: bytearray, effort: dict[str, int] = None) -> bool:
+    """
+    Knuth's Algorithm X on the 324 column sudoku exact cover matrix.
+    Givens are covered on the shared matrix, the rest is searched for,
+    and everything is uncovered again so the next puzzle gets a clean matrix.
+    Algorithm writes values to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param effort: A dict counting nodes and backtracks, if given
+    :return: Boolean value indicating if solution was found or not
+    :rtype: bool
+    """
+
+    return exact_cover_count(grid, 1, effort) > 0
+
+
+def exact_cover_count(
+    grid: bytearray, limit: int, effort: dict[str, int] = None
+) -> int:
+    """
+    Counts solutions with Algorithm X, stopping as soon as limit is reached.
+    First solution found is written to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param limit: Stop counting after this many solutions
+    :param effort: A dict counting nodes and backtracks, if given
+    :return: Number of solutions found, never more than limit
+    :rtype: int
+    """
+
+    columns, rows = exact_cover_matrix()
+
+    # Cover the givens. A given hitting a covered column breaks the rules.
+    givens = []
+    valid = True
+    for cell in range(81):
+        if grid[cell] == FREE:
+            continue
+        choice = cell * 9 + grid[cell] - FREE - 1
+        if not all(column in columns for column in rows[choice]):
+            valid = False
+            break
+        givens.append((choice, cover(columns, rows, choice)))
+
+    solution = []
+    found = valid and exact_cover_search(columns, rows, solution, limit, effort)
+    for choice, removed in reversed(givens):
+        uncover(columns, rows, choice, removed)
+    if not found:
+        return 0
+    for choice in solution:
+        cell, digit = divmod(choice, 9)
+        grid[cell] = DIGITS[digit]
+
+    return found
+
+
+def exact_cover_search(
+    columns: dict[int, set],
+    rows: tuple[tuple[int]],
+    solution: list[int],
+    limit=1,
+    effort: dict[str, int] = None,
+) -> int:
+    """
+    Recursive part of Algorithm X. Picks the column with the fewest rows left,
+    and tries to cover it with each of them until limit solutions are found.
+    Matrix is always restored before returning.
+
+    :param columns: A dict of column number and a set of rows having 1 in that column
+    :param rows: A tuple of columns having 1 in given row, row number is cell * 9 + digit - 1
+    :param solution: A list where rows of the first solution are collected
+    :param limit: Stop searching after this many solutions
+    :param effort: A dict counting nodes and backtracks, if given,
+    a node is a call and a backtrack is a call which found nothing
+    :return: Number of solutions found, never more than limit
+    :rtype: int
+    """
+
+    if effort is not None:
+        effort["nodes"] += 1
+    if not columns:
+        return 1
+    column = min(columns, key=lambda column: len(columns[column]))
+    found = 0
+    for choice in list(columns[column]):
+        # Once the first solution is in, further paths go to a throwaway list.
+        path = solution if not found else []
+        path.append(choice)
+        removed = cover(columns, rows, choice)
+        found += exact_cover_search(columns, rows, path, limit - found, effort)
+        uncover(columns, rows, choice, removed)
+        if found >= limit:
+            break
+        if not found:
+            solution.pop()
+    if not found and effort is not None:
+        effort["backtracks"] += 1
+
+    return found
+
+
+def cover(columns: dict[int, set], rows: tuple[tuple[int]], choice: int) -> list[set]:
+    """
+    Removes columns satisfied by chosen row, and every row clashing with it.
+
+    :param columns: A dict of column number and a set of rows having 1 in that column
+    :param rows: A tuple of columns having 1 in given row
+    :param choice: Chosen row number
+    :return: A list of removed column sets, needed for uncover()
     :rtype: list
     """
 
-    # Create an object and call methods
-    puzzle = data["puzzle"]
-    s1 = Sudoku(puzzle)
-    s1.solve()
-    solution = {"puzzle": s1.to_oneliner()}
-    solution = gridops.make_grid(solution)
+    removed = []
+    for column in rows[choice]:
+        for clash in columns[column]:
+            for other in rows[clash]:
+                if other != column:
+                    columns[other].remove(clash)
+        removed.append(columns.pop(column))
+
+    return removed
 
-    return solution
 
+def uncover(
+    columns: dict[int, set], rows: tuple[tuple[int]], choice: int, removed: list[set]
+) -> None:
+    """
+    Reverts cover() for given row. Has to be called in reverse order of cover() calls.
 
-def boost_bact_r_solve(grid: list[list[str]], valid_vals: dict[tuple]) -> bool:
+    :param columns: A dict of column number and a set of rows having 1 in that column
+    :param rows: A tuple of columns having 1 in given row
+    :param choice: Chosen row number
+    :param removed: A list of column sets returned by cover()
+    """
+
+    for column in reversed(rows[choice]):
+        columns[column] = removed.pop()
+        for clash in columns[column]:
+            for other in rows[clash]:
+                if other != column:
+                    columns[other].add(clash)
+
+
+def exact_cover_matrix() -> tuple[dict[int, set], tuple[tuple[int]]]:
+    """
+    Returns sudoku exact cover matrix, building it on the first call only.
+    Row cell * 9 + digit - 1 means "digit in cell", and it has 1 in four columns:
+    cell filled, digit in the row, digit in the column and digit in the 3x3 square.
+
+    :return: A dict of column sets, and a tuple of each row's columns
+    :rtype: tuple
+    """
+
+    if not EXACT_COVER:
+        rows = tuple(
+            (
+                cell,
+                81 + ROW_OF[cell] * 9 + digit,
+                162 + COL_OF[cell] * 9 + digit,
+                243 + BOX_OF[cell] * 9 + digit,
+            )
+            for cell in range(81)
+            for digit in range(9)
+        )
+        columns = {column: set() for column in range(324)}
+        for choice, row in enumerate(rows):
+            for column in row:
+                columns[column].add(choice)
+        EXACT_COVER["columns"] = columns
+        EXACT_COVER["rows"] = rows
+
+    return EXACT_COVER["columns"], EXACT_COVER["rows"]
+
+
+def numpy_batch_solve(grids: list[bytearray]) -> list[bool]:
+    """
+    Solves many puzzles at once. All of them go into one (N, 81) NumPy array,
+    and naked and hidden singles are placed for the whole batch with array operations
+    on (N, 81) 9-bit candidate masks. Only puzzles which still have free cells after that
+    are passed to the bitmask solver one by one.
+    Algorithm writes values to the lists which were the argument in function call.
+
+    :param grids: A list of compact grids representing sudoku puzzles
+    :return: A list of boolean values indicating if solution was found or not
+    :rtype: list
+    """
+
+    if not grids:
+        return []
+    board = np.frombuffer(b"".join(grids), dtype=np.uint8).reshape(-1, 81) - FREE
+    dead = np.zeros(len(grids), dtype=bool)
+    active = np.arange(len(grids))
+
+    while active.size:
+        part = board[active]
+        empty = part == 0
+
+        # Masks of digits used in each of 27 units. Duplicates mean no solution.
+        bits = (1 << part.astype(np.uint16)) >> 1
+        in_units = bits[:, UNIT_IDX]
+        used = np.bitwise_or.reduce(in_units, axis=2)
+        stuck = (POPCOUNT[used] != (in_units != 0).sum(axis=2)).any(axis=1)
+
+        # Candidates left for each cell, and naked singles.
+        cands = ALL_DIGITS & ~(used[:, ROW_IDX] | used[:, COL_IDX] | used[:, BOX_IDX])
+        cands[~empty] = 0
+        counts = POPCOUNT[cands]
+        stuck |= (empty & (counts == 0)).any(axis=1)
+        values = np.where(counts == 1, BIT_DIGIT[cands], 0)
+
+        # Hidden singles. Digits seen in exactly one cell of a unit.
+        unit_cands = cands[:, UNIT_IDX]
+        seen_once = np.zeros_like(used)
+        seen_more = np.zeros_like(used)
+        for place in range(9):
+            seen_more |= seen_once & unit_cands[:, :, place]
+            seen_once |= unit_cands[:, :, place]
+        stuck |= ((used | seen_once) != ALL_DIGITS).any(axis=1)
+        hits = unit_cands & (seen_once & ~seen_more)[:, :, None]
+        stuck |= (POPCOUNT[hits] > 1).any(axis=(1, 2))
+        puzzle, unit, place = np.nonzero(hits)
+        values[puzzle, UNIT_IDX[unit, place]] = BIT_DIGIT[hits[puzzle, unit, place]]
+
+        dead[active[stuck]] = True
+        board[active] = part + values
+        active = active[~stuck & values.any(axis=1)]
+
+    statuses = []
+    for grid, cells, failed in zip(grids, board, dead):
+        if failed:
+            statuses.append(False)
+            continue
+        solved = bytearray((cells + FREE).tobytes())
+        status = FREE not in solved or bitmask_solve(solved)
+        if status:
+            grid[:] = solved
+        statuses.append(status)
+
+    return statuses
+
+
+def boost_bact_r_solve(
+    grid: bytearray, valid_vals: dict[int, list[int]], effort: dict[str, int] = None
+) -> bool:
     """
     A backtracking recursive algorithm for solving sudoku puzzle.
     Takes additional argument being a dict of possible values for given board field.
+    Always branches on the free field with the fewest possible values left (MRV),
+    and keeps the dict up to date while values are placed and taken back.
     Algorithm writes values to the list which was the argument in function call.
 
-    :param grid: A list of list representing sudoku puzzle
+    :param grid: A compact grid representing sudoku puzzle
     :param valid_vals: A dict containing possible values for each free board field
+    :param effort: A dict counting nodes and backtracks, if given,
+    a node is a call and a backtrack is a call which found nothing
     :return: Boolean value indicating if solution was found or not
     :rtype: bool
     """
 
-    # Test showed that leaving finding empty cell to external function,
-    # result in shorter process duration in comparison to passing the whole free cells list,
-    # as in the bact_r_solve algorithm.
-    to_check = find_empty(grid)
-    if not to_check:
+    if effort is not None:
+        effort["nodes"] += 1
+    # Every free field is a key of valid_vals, so no keys left means the grid is full.
+    if not valid_vals:
         return True
-    row, col = to_check
-    for num in valid_vals[(row, col)]:
-        if validator(grid, str(num), to_check):
-            grid[row][col] = str(num)
-            if boost_bact_r_solve(grid, valid_vals):
+    to_check = min(valid_vals, key=lambda cell: len(valid_vals[cell]))
+    candidates = valid_vals.pop(to_check)
+    for num in candidates:
+        grid[to_check] = num
+        removed = eliminate_candidate(valid_vals, to_check, num)
+
+        # Values left in the dict are valid already, no need for the validator.
+        if all(valid_vals[cell] for cell in removed):
+            if boost_bact_r_solve(grid, valid_vals, effort):
                 return True
-            grid[row][col] = str(0)
+        for cell in removed:
+            valid_vals[cell].append(num)
+    grid[to_check] = FREE
+    valid_vals[to_check] = candidates
+    if effort is not None:
+        effort["backtracks"] += 1
 
     return False
 
 
-def ordered_valid_vals(valid_vals: dict[tuple, list[str]]) -> dict[tuple, list[str]]:
+def eliminate_candidate(
+    valid_vals: dict[int, list[int]], position: int, digit: int
+) -> list[int]:
+    """
+    Removes a digit placed at given position from possible values of free fields
+    in the same row, column and 3x3 square.
+
+    :param valid_vals: A dict containing possible values for each free board field
+    :param position: Cell number of placed digit
+    :param digit: A digit byte placed at given position
+    :return: A list of fields the digit was removed from, for undoing the change
+    :rtype: list of ints
+    """
+
+    removed = []
+    for peer in PEERS[position]:
+        vals = valid_vals.get(peer)
+        if vals and digit in vals:
+            vals.remove(digit)
+            removed.append(peer)
+
+    return removed
+
+
+def ordered_valid_vals(valid_vals: dict[int, list[int]]) -> dict[int, list[int]]:
     """
     Checks the frequency od found valid values for given grid field,
     and orders them by ascending order
 
-    :param valid_vals: A dict of strings containing available values for given fields
-    :return: A dict of strings containing available values for given fields in ascending order
-    :rtype: dict of strings
+    :param valid_vals: A dict of digit bytes containing available values for given fields
+    :return: A dict of digit bytes containing available values for given fields in ascending order
+    :rtype: dict of lists
     """
 
     # Check whether cell coordinates are in in valid vals.
     prioritized_valid_vals = {}
-    for row in range(9):
-        for col in range(9):
-            if (row, col) not in valid_vals:
-                continue
+    for cell in range(81):
+        if cell not in valid_vals:
+            continue
 
-            # Count the number of digit appearances in valid values.
-            num_of_appearances = {}
-            for digit in valid_vals[(row, col)]:
-                if digit not in num_of_appearances:
-                    num_of_appearances[digit] = 0
-                num_of_appearances[digit] += 1
+        # Count the number of digit appearances in valid values.
+        num_of_appearances = {}
+        for digit in valid_vals[cell]:
+            if digit not in num_of_appearances:
+                num_of_appearances[digit] = 0
+            num_of_appearances[digit] += 1
 
-            # Sort valid values by frequency
-            sorted_valid_vals = []
-            for digit in num_of_appearances:
-                sorted_valid_vals.append((num_of_appearances[digit], digit))
-            sorted_valid_vals.sort()
+        # Sort valid values by frequency
+        sorted_valid_vals = []
+        for digit in num_of_appearances:
+            sorted_valid_vals.append((num_of_appearances[digit], digit))
+        sorted_valid_vals.sort()
 
-            # Update prioritized valid values dict.
-            prioritized_valid_vals[(row, col)] = [
-                digit for (_, digit) in sorted_valid_vals
-            ]
+        # Update prioritized valid values dict.
+        prioritized_valid_vals[cell] = [digit for (_, digit) in sorted_valid_vals]
 
     # Update valid vals dicty with sorted valid values.
-    for (row, col), sorted_valid_vals in prioritized_valid_vals.items():
-        valid_vals[(row, col)] = sorted_valid_vals
+    for cell, sorted_valid_vals in prioritized_valid_vals.items():
+        valid_vals[cell] = sorted_valid_vals
 
     return valid_vals
 
 
-def scan_for_valid_vals(grid: list[list[str]]) -> dict[tuple, list[str]]:
+def scan_for_valid_vals(grid: bytearray) -> dict[int, list[int]]:
     """
-    Function scanning given sudoku grid, and filling a dictionary with tuple (row, col) as keys,
+    Function scanning given sudoku grid, and filling a dictionary with cell numbers as keys,
     and a list of possible values for given free field of sudoku grid.
     List is provided by "find_valid_vals" function.
 
-    :param grid: A list of list representing sudoku puzzle
-    :return: A dict with key[(row, col) tuple]: [list of possible values]
-    :rtype: dict of strings
+    :param grid: A compact grid representing sudoku puzzle
+    :return: A dict with key[cell number]: [list of possible digit bytes]
+    :rtype: dict of lists
     """
 
     valid_vals = {
-        (row, col): find_valid_vals(grid, (row, col))
-        for row in range(9)
-        for col in range(9)
-        if grid[row][col] == "0"
+        cell: find_valid_vals(grid, cell) for cell in range(81) if grid[cell] == FREE
     }
     valid_vals = ordered_valid_vals(valid_vals)
 
     return valid_vals
 
 
-def find_valid_vals(grid: list[list[str]], position: tuple[int, int]) -> set:
+def find_valid_vals(grid: bytearray, position: int) -> set:
     """
-    Finds possible values for given sudoku field (row col) tuple.
+    Finds possible values for given sudoku field (cell number).
     Adds them to the set, and returns it
 
-    :param grid: A list of list representing sudoku puzzle
-    :param position: A tuple with row and column indices of a grid
-    :return: A set of possible values for given grid's field
+    :param grid: A compact grid representing sudoku puzzle
+    :param position: Cell number of a grid
+    :return: A set of possible digit bytes for given grid's field
     :rtype: set
     """
 
-    y_axis, x_axis = position
-    valid_numbers = set()
-
-    for digit in range(1, 10):
-        # Continue if digit is in the set
-        if grid[y_axis][x_axis] == str(digit):
-            continue
-
-        # Check row, column, and square for possible cell digits.
-        for row in range(9):
-            if grid[y_axis][row] == str(digit) or grid[row][x_axis] == str(digit):
-                break
-        else:
-            # Else clause for loops is executed once,
-            # after loop reaches its final iteration.
-            # Thank you, Cisco Networking Academy :)
-            square_y = y_axis // 3
-            square_x = x_axis // 3
-            for row in range(square_y * 3, square_y * 3 + 3):
-                for col in range(square_x * 3, square_x * 3 + 3):
-                    if grid[row][col] == str(digit):
-                        break
-            else:
-                valid_numbers.add(str(digit))
+    # Every digit not seen in the 20 peers, and not the one in the cell itself.
+    valid_numbers = set(DIGITS).difference(grid[peer] for peer in PEERS[position])
+    valid_numbers.discard(grid[position])
 
     return valid_numbers
 
 
-def bact_r_solve(grid: list[list[str]], free_fields: list[tuple], depth=0) -> bool:
+def bact_r_solve(
+    grid: bytearray, free_fields: list[int], depth=0, effort: dict[str, int] = None
+) -> bool:
     """
     A backtracking recursive algorithm for solving sudoku puzzle.
     Algorithm writes values to the list which was the argument in function call.
 
-    :param grid: A list of list representing sudoku puzzle
-    :param free_fields: A list of tuples representing free cells of sudoku grid
+    :param grid: A compact grid representing sudoku puzzle
+    :param free_fields: A list of cell numbers representing free cells of sudoku grid
     :param depth: A value indicating where for loop should start iteration over free cells
+    :param effort: A dict counting nodes, backtracks and validator calls, if given,
+    a node is a call and a backtrack is a call which found nothing
     :return: Boolean value indicating if solution was found or not
     :rtype: bool
     """
 
+    if effort is not None:
+        effort["nodes"] += 1
     # Choose next free field. Start at depth argument.
     # Return True if reached end of the list.
     if depth == len(free_fields):
         return True
-    for item in range(depth, len(free_fields)):
-        to_check = free_fields[item]
-        break
-    row, col = to_check
+    to_check = free_fields[depth]
 
     # Check every possible combination.
     # Return True if everything was solved.
-    for num in range(1, 10):
-        if validator(grid, str(num), to_check):
-            grid[row][col] = str(num)
+    for num in DIGITS:
+        if effort is not None:
+            effort["validator"] += 1
+        if validator(grid, num, to_check):
+            grid[to_check] = num
             depth += 1
-            if bact_r_solve(grid, free_fields, depth):
+            if bact_r_solve(grid, free_fields, depth, effort):
                 return True
-            grid[row][col] = "0"
+            grid[to_check] = FREE
             depth -= 1
+    if effort is not None:
+        effort["backtracks"] += 1
 
     return False
 
 
-def validator(grid: list, digit: str, position: tuple) -> bool:
+def stack_solve(
+    grid: bytearray,
+    free_fields: list[int],
+    valid_vals: dict[int, list[int]] = None,
+    stack: array.array = None,
+    max_steps=0,
+    effort: dict[str, int] = None,
+) -> bool | None:
+    """
+    Non-recursive backtracking. Instead of one function call per free cell,
+    an array-backed stack keeps one entry per filled free cell: the index of the next
+    candidate to try there. The cell itself is free_fields[depth].
+    Algorithm writes values to the list which was the argument in function call.
+
+    Search can be paused by max_steps, and resumed by calling it again with
+    the same grid and stack.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param free_fields: A list of cell numbers representing free cells of sudoku grid
+    :param valid_vals: A dict containing possible values for each free board field,
+    digits 1-9 are tried if not given
+    :param stack: An array of candidate indices from a paused search, new search if not given
+    :param max_steps: Number of placements after which search is paused, 0 for no limit
+    :param effort: A dict counting placements as nodes, backtracks and validator calls,
+    if given
+    :return: True if solved, False if there is no solution, None if paused
+    :rtype: bool or None
+    """
+
+    if stack is None:
+        stack = array.array("b", [0])
+    steps = 0
+    backtracks = 0
+    checks = 0
+    status = False
+    while stack:
+        depth = len(stack) - 1
+        if depth == len(free_fields):
+            status = True
+            break
+        to_check = free_fields[depth]
+        options = valid_vals[to_check] if valid_vals else DIGITS
+
+        # Find next valid candidate for the cell on top of the stack.
+        index = stack[depth]
+        grid[to_check] = FREE
+        while index < len(options):
+            checks += 1
+            if validator(grid, options[index], to_check):
+                break
+            index += 1
+
+        # Nothing left to try here, so backtrack into the previous cell.
+        if index == len(options):
+            stack.pop()
+            backtracks += 1
+            continue
+        grid[to_check] = options[index]
+        stack[depth] = index + 1
+        stack.append(0)
+        steps += 1
+        if steps == max_steps:
+            status = None
+            break
+    if effort is not None:
+        effort["nodes"] += steps
+        effort["backtracks"] += backtracks
+        effort["validator"] += checks
+
+    return status
+
+
+def boost_stack_solve(
+    grid: bytearray, valid_vals: dict[int, list[int]], effort: dict[str, int] = None
+) -> bool:
+    """
+    Boosted R&B without recursion. Branches on the free field with the fewest
+    possible values left (MRV) and keeps the dict up to date, like boost_bact_r_solve,
+    but a list of frames stands in for the call stack, so there is no recursion limit.
+    A frame holds the cell, its candidates, the index of the next one to try,
+    and the fields the placed candidate was removed from.
+    Algorithm writes values to the list which was the argument in function call.
+
+    :param grid: A compact grid representing sudoku puzzle
+    :param valid_vals: A dict containing possible values for each free board field
+    :param effort: A dict counting placements as nodes and backtracks, if given
+    :return: Boolean value indicating if solution was found or not
+    :rtype: bool
+    """
+
+    frames = []
+    steps = 0
+    backtracks = 0
+    status = False
+    while True:
+        # Every free field is a key of valid_vals, so no keys left means the grid is full.
+        if not valid_vals:
+            status = True
+            break
+        to_check = min(valid_vals, key=lambda cell: len(valid_vals[cell]))
+        frames.append([to_check, valid_vals.pop(to_check), 0, None])
+
+        # Place next candidate of the top frame, popping frames with nothing left.
+        while frames:
+            frame = frames[-1]
+            cell, candidates, index, removed = frame
+            if removed is not None:
+                for peer in removed:
+                    valid_vals[peer].append(candidates[index - 1])
+                frame[3] = None
+            while index < len(candidates):
+                num = candidates[index]
+                index += 1
+                grid[cell] = num
+                removed = eliminate_candidate(valid_vals, cell, num)
+
+                # Values left in the dict are valid already, no need for the validator.
+                if all(valid_vals[peer] for peer in removed):
+                    frame[2], frame[3] = index, removed
+                    break
+                for peer in removed:
+                    valid_vals[peer].append(num)
+            if frame[3] is not None:
+                steps += 1
+                break
+            grid[cell] = FREE
+            valid_vals[cell] = candidates
+            frames.pop()
+            backtracks += 1
+        else:
+            break
+    if effort is not None:
+        effort["nodes"] += steps
+        effort["backtracks"] += backtracks
+
+    return status
+
+
+def validator(grid: bytearray, digit: int, position: int) -> bool:
     """
     Algorithm for validating if given value at given grid's position can be put in it,
     based of games rules, row, column and 3x3 square can't contain duplicates of any 1-9 value.
 
-    :param grid: A list of list representing sudoku puzzle
-    :param digit: A value to put into given grid's field
-    :param position: A tuple with row and column indices
+    :param grid: A compact grid representing sudoku puzzle
+    :param digit: A digit byte to put into given grid's field
+    :param position: Cell number of a grid
     :return: True or False for given value
     :rtype: bool
     """
 
-    y_axis, x_axis = position
-
-    # Check row for duplicates
-    for row in range(9):
-        if grid[y_axis][row] == digit and x_axis != row:
-            return False
-
-    # Check col for duplicates
-    for col in range(9):
-        if grid[col][x_axis] == digit and y_axis != col:
+    # Check row, col and 3x3 square for duplicates
+    for peer in PEERS[position]:
+        if grid[peer] == digit:
             return False
 
-    # Check 3x3 square for duplicates
-    square_x = x_axis // 3
-    square_y = y_axis // 3
-    for row in range(square_y * 3, square_y * 3 + 3):
-        for col in range(square_x * 3, square_x * 3 + 3):
-            if grid[row][col] == digit and (row, col) != position:
-                return False
-
     return True
 
 
-def find_empty(grid: list[list[str]]) -> tuple:
+def find_empty(grid: bytearray) -> int | None:
     """
-    Checks if given board field is empty or not returning row, col tuple.
+    Checks if given board field is empty or not returning its cell number.
     Returns None otherwise.
 
-    :param grid: A list of list representing sudoku puzzle
-    :return: A tuple containing row and colum indices or None value
-    :rtype: tuple or None value
+    :param grid: A compact grid representing sudoku puzzle
+    :return: Cell number or None value
+    :rtype: int or None value
     """
 
-    for row in range(9):
-        for col in range(9):
-            if grid[row][col] == "0":
-                return row, col
+    cell = grid.find(FREE)
+    if cell < 0:
+        return None
+    return cell
 
 
-def list_of_free_fields(grid: list[list[str]]) -> list[tuple[int, int]]:
+def list_of_free_fields(grid: bytearray) -> list[int]:
     """
     Make list of free fields to speed up recursion & backtrack algorithm.
 
-    :param grid: A list of list representing sudoku puzzle
-    :return: A list of tuples containing free cells addresses
-    :rtype: list of tuples of integers
+    :param grid: A compact grid representing sudoku puzzle
+    :return: A list of cell numbers of free cells
+    :rtype: list of integers
+    """
+
+    return [cell for cell, value in enumerate(grid) if value == FREE]
+
+
+def run_solver(
+    solver: dict, grid: bytearray, options: dict, effort: dict[str, int] = None
+) -> bool | None:
+    """
+    Runs a single puzzle through a registered solver. Precomputation declared by the
+    solver is done here, so the pipelines don't need to know about it.
+
+    :param solver: A solver entry from SOLVERS
+    :param grid: A compact grid representing sudoku puzzle
+    :param options: Run options (rng, budget, time_limit) from the command line
+    :param effort: A dict for a tracked solver to count search effort into, if given
+    :return: True if solved, False if not, None if solver gave up
+    :rtype: bool or None value
+    """
+
+    arguments = () if solver["prepare"] is None else solver["prepare"](grid, options)
+    if effort is None:
+        return solver["solve"](grid, *arguments)
+    return solver["solve"](grid, *arguments, effort=effort)
+
+
+def run_counter(
+    solver: dict, grid: bytearray, limit: int, effort: dict[str, int] = None
+) -> int:
+    """
+    Counts solutions of a single puzzle with a registered solver, up to limit.
+
+    :param solver: A solver entry from SOLVERS, with a count entry point
+    :param grid: A compact grid representing sudoku puzzle, gets the first solution
+    :param limit: Stop counting after this many solutions
+    :param effort: A dict for a tracked solver to count search effort into, if given
+    :return: Number of solutions found, never more than limit
+    :rtype: int
+    """
+
+    if effort is None:
+        return solver["count"](grid, limit)
+    return solver["count"](grid, limit, effort=effort)
+
+
+def run_batch(solver: dict, grids: list[bytearray]) -> list[bool]:
+    """
+    Runs a list of puzzles through a batchable solver.
+
+    :param solver: A batchable solver entry from SOLVERS
+    :param grids: A list of compact grids, solved in place
+    :return: Solution status for every grid
+    :rtype: list of bools
+    """
+
+    return solver["solve"](grids)
+
+
+def measure(
+    solver: dict, details: bool, function: collections.abc.Callable, *args
+) -> tuple[object, tuple[int, int | None, int | None, int | None] | None]:
+    """
+    Runs a single puzzle through function and measures it, if details are asked for.
+
+    :param solver: A solver entry from SOLVERS
+    :param details: Measure the puzzle, nothing is measured if False
+    :param function: run_solver or run_counter, tracked solvers get a fresh effort dict
+    :param args: Arguments for function
+    :return: What function returned, and latency in ns, nodes, backtracks and validator calls,
+    search effort is None for solvers not tracking it, everything is None if not measured
+    :rtype: tuple
+    """
+
+    if not details:
+        return function(*args), None
+    if not solver["tracked"]:
+        start = time.perf_counter_ns()
+        result = function(*args)
+        return result, (time.perf_counter_ns() - start, None, None, None)
+    effort = {"nodes": 0, "backtracks": 0, "validator": 0}
+    start = time.perf_counter_ns()
+    result = function(*args, effort=effort)
+    latency = time.perf_counter_ns() - start
+
+    return result, (latency, effort["nodes"], effort["backtracks"], effort["validator"])
+
+
+def solve_stream(
+    number: int, entries: collections.abc.Iterable[dict], options: dict, limit=0, jobs=1
+) -> collections.abc.Iterator[
+    tuple[dict, bytearray, bool | None, int | str, tuple | None]
+]:
+    """
+    Solving stage of the streaming pipeline. Takes puzzle entries one by one
+    and yields them back with their results as soon as they are ready.
+    Batch solvers and worker processes get the entries in chunks,
+    so no more than a chunk or a few is held in memory at a time.
+
+    :param number: Method number of the solver in SOLVERS
+    :param entries: Dicts containing sudoku data, puzzle under the "puzzle" key
+    :param options: Run options (seed, budget, time_limit, details) from the command line
+    :param limit: Count solutions up to limit instead of solving, 0 to just solve
+    :param jobs: Number of worker processes, 1 solves in this process
+    :return: Entry, solved grid, solution status, solution count ("N/A" if not counted)
+    and effort measured with details option (see measure), None for batches or without it
+    :rtype: Iterator of tuples
+    """
+
+    solver = SOLVERS[number]
+    if jobs > 1 and solver["parallel_safe"]:
+        yield from parallel_solve(number, entries, jobs, options, limit)
+        return
+    if solver["setup"] is not None:
+        solver["setup"]()
+    details = options.get("details", False)
+    options = dict(options, rng=random.Random(options["seed"]))
+
+    if solver["batchable"] and not limit:
+        for chunk in chunked(entries, BATCH_SIZE):
+            grids = [gridops.make_grid(entry) for entry in chunk]
+            for entry, grid, status in zip(chunk, grids, run_batch(solver, grids)):
+                yield entry, grid, status, "N/A", None
+    elif limit:
+        for entry in entries:
+            grid = gridops.make_grid(entry)
+            count, effort = measure(solver, details, run_counter, solver, grid, limit)
+            yield entry, grid, count > 0, count, effort
+    else:
+        for entry in entries:
+            grid = gridops.make_grid(entry)
+            status, effort = measure(solver, details, run_solver, solver, grid, options)
+            yield entry, grid, status, "N/A", effort
+
+
+def parallel_solve(
+    number: int,
+    entries: collections.abc.Iterable[dict],
+    jobs: int,
+    options: dict,
+    limit=0,
+) -> collections.abc.Iterator[
+    tuple[dict, bytearray, bool | None, int | str, tuple | None]
+]:
+    """
+    Spreads puzzles across a pool of worker processes in chunks, and yields the results
+    in the same order as the puzzles. Only a few chunks are submitted ahead,
+    so memory use doesn't grow with the size of the file.
+
+    :param number: Method number of the solver in SOLVERS
+    :param entries: Dicts containing sudoku data, puzzle under the "puzzle" key
+    :param jobs: Number of worker processes
+    :param options: Run options (seed, budget, time_limit, details) from the command line
+    :param limit: Count solutions up to limit instead of solving, 0 to just solve
+    :return: Entry, solved grid, solution status, solution count ("N/A" if not counted)
+    and effort (see solve_stream)
+    :rtype: Iterator of tuples
+    """
+
+    with concurrent.futures.ProcessPoolExecutor(
+        jobs, initializer=setup_worker, initargs=(number,)
+    ) as executor:
+        pending = collections.deque()
+        for index, chunk in enumerate(chunked(entries, CHUNK_SIZE)):
+            puzzles = [entry["puzzle"] for entry in chunk]
+            future = executor.submit(
+                solve_chunk, number, puzzles, options, limit, index
+            )
+            pending.append((chunk, future))
+            if len(pending) >= jobs * CHUNKS_PER_JOB:
+                chunk, future = pending.popleft()
+                for entry, result in zip(chunk, future.result()):
+                    yield entry, *result
+        while pending:
+            chunk, future = pending.popleft()
+            for entry, result in zip(chunk, future.result()):
+                yield entry, *result
+
+
+def chunked(
+    iterable: collections.abc.Iterable, size: int
+) -> collections.abc.Iterator[list]:
+    """
+    Splits an iterable into lists of given size, the last one can be shorter.
+
+    :param iterable: Any iterable, read lazily
+    :param size: Length of a chunk
+    :return: Lists of consecutive items
+    :rtype: Iterator of lists
+    """
+
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def setup_worker(number: int) -> None:
+    """
+    Runs one time precomputation of the solver once in every worker process.
+
+    :param number: Method number of the solver in SOLVERS
+    """
+
+    if SOLVERS[number]["setup"] is not None:
+        SOLVERS[number]["setup"]()
+
+
+def solve_chunk(
+    number: int, puzzles: list[str], options: dict, limit: int, index: int
+) -> list[tuple[bytearray, bool | None, int | str, tuple | None]]:
+    """
+    Worker side of parallel_solve(). Solves, or counts solutions of, a chunk of puzzles.
+    Random walk gets its own generator for every chunk, seeded from the run seed
+    and chunk index, so seeded runs repeat no matter which worker gets the chunk.
+
+    :param number: Method number of the solver in SOLVERS
+    :param puzzles: A list of 81 character puzzle strings
+    :param options: Run options (seed, budget, time_limit, details) from the command line
+    :param limit: Count solutions up to limit instead of solving, 0 to just solve
+    :param index: Chunk number
+    :return: Solved grid, solution status, solution count ("N/A" if not counted) and effort
+    :rtype: list of tuples
     """
 
-    free_fields = []
-    for row in range(9):
-        for col in range(9):
-            if grid[row][col] == "0":
-                free_fields.append((row, col))
-    return free_fields
+    solver = SOLVERS[number]
+    seed = options["seed"]
+    details = options.get("details", False)
+    options = dict(
+        options, rng=random.Random(None if seed is None else f"{seed}:{index}")
+    )
+    grids = [bytearray(puzzle, "ascii") for puzzle in puzzles]
+    if limit:
+        counts = [
+            measure(solver, details, run_counter, solver, grid, limit) for grid in grids
+        ]
+        return [
+            (grid, count > 0, count, effort)
+            for grid, (count, effort) in zip(grids, counts)
+        ]
+    if solver["batchable"]:
+        statuses = [(status, None) for status in run_batch(solver, grids)]
+    else:
+        statuses = [
+            measure(solver, details, run_solver, solver, grid, options)
+            for grid in grids
+        ]
+
+    return [
+        (grid, status, "N/A", effort) for grid, (status, effort) in zip(grids, statuses)
+    ]
+
+
+# Solver registry, keyed by method number from the command line.
+# name - used in the stats DB, description - shown in --method help,
+# solve - entry point filling the grid in place,
+# prepare - per puzzle precomputation, returns extra arguments for solve,
+# count - entry point counting solutions up to a limit, None if not supported,
+# setup - one time precomputation shared by every puzzle,
+# batchable - solve takes a list of grids, parallel_safe - fine in worker processes,
+# deterministic - the same puzzle always gets the same solution,
+# cacheable - solutions are right and can be reused from the solution cache,
+# tracked - solve and count take an effort dict to count nodes, backtracks, validator calls.
+SOLVERS = {
+    1: {
+        "name": "R&B",
+        "description": "recursion and backtracking",
+        "solve": bact_r_solve,
+        "prepare": lambda grid, options: (list_of_free_fields(grid),),
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": True,
+    },
+    2: {
+        "name": "Boosted R&B",
+        "description": "recursion and backtracking looking ahead for available valid values",
+        "solve": boost_bact_r_solve,
+        "prepare": lambda grid, options: (scan_for_valid_vals(grid),),
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": True,
+    },
+    3: {
+        "name": "DLXSudoku",
+        "description": "Dlxsudoku module from PyPl",
+        "solve": dlxsudoku_module,
+        "prepare": None,
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": False,
+    },
+    4: {
+        "name": "Random walk",
+        "description": "bounded by --budget and --time-limit, see --seed too",
+        "solve": random_walk,
+        "prepare": lambda grid, options: (
+            options["rng"],
+            options["budget"],
+            options["time_limit"],
+        ),
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": False,
+        "cacheable": True,
+        "tracked": True,
+    },
+    5: {
+        "name": "Cake algorithm",
+        "description": "solves nothing, but tells the truth about the cake",
+        "solve": cake_algo,
+        "prepare": None,
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": False,
+        "tracked": False,
+    },
+    6: {
+        "name": "Bitmask CP",
+        "description": "bitmask constraint propagation with naked and hidden singles",
+        "solve": bitmask_solve,
+        "prepare": None,
+        "count": bitmask_count,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": True,
+    },
+    7: {
+        "name": "Iterative R&B",
+        "description": "boosted R&B, fewest valid values first, on an explicit stack",
+        "solve": boost_stack_solve,
+        "prepare": lambda grid, options: (scan_for_valid_vals(grid),),
+        "count": None,
+        "setup": None,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": True,
+    },
+    8: {
+        "name": "Algorithm X",
+        "description": "exact cover, same idea as Dlxsudoku without per puzzle setup",
+        "solve": exact_cover_solve,
+        "prepare": None,
+        "count": exact_cover_count,
+        "setup": exact_cover_matrix,
+        "batchable": False,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": True,
+    },
+    9: {
+        "name": "NumPy batch",
+        "description": "singles placed for all puzzles at once, bitmask solver for the rest",
+        "solve": numpy_batch_solve,
+        "prepare": None,
+        "count": None,
+        "setup": None,
+        "batchable": True,
+        "parallel_safe": True,
+        "deterministic": True,
+        "cacheable": True,
+        "tracked": False,
+    },
+}
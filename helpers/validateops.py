@@ -3,7 +3,18 @@ import re
 import sys
 import datetime
 
-import fileops
+# Compiled once, rows are validated for every line of the file.
+PUZZLE_PATTERN = re.compile(r"[0-9]{81}")
+SOLUTION_PATTERN = re.compile(r"[1-9]{81}")
+# Whole puzzle,solution lines, keyed by the first column of the header.
+PAIR_PATTERNS = {
+    "puzzle": re.compile(r"(?P<puzzle>[0-9]{81}),(?P<solution>[1-9]{81})"),
+    "solution": re.compile(r"(?P<solution>[1-9]{81}),(?P<puzzle>[0-9]{81})"),
+}
+
+# Delimiters and free cell marks recognised by sniff_head(), first ones win a tie.
+DELIMITERS = (",", ";", "\t", "|", " ")
+BLANKS = ("0", ".")
 
 
 def validate_file(filename: str) -> bool:
@@ -19,47 +30,48 @@ def validate_file(filename: str) -> bool:
     return os.path.isfile(f"{filename}")
 
 
-def determine_headers(file: str, lines_loc: list[int]) -> list[str]:
+def sniff_head(lines: list[str], solutions: bool) -> tuple[list[str], str, str]:
     """
-    Returns header list for csv.DictReader() based on the sample of data read from a file.
-
-    :param file: filename or filepath as a str
-    :param lines_loc: List of integer number of byte position for a given line
-    :raise IOError: If something's wrong with the file
-    :return: A list of headers for csv.DictReader() determining where are the puzzles,
-    and where are the solutions
-    :rtype: list
+    Works out the layout of a file from lines read from its head:
+    header for the columns (puzzles first or solutions first), the delimiter,
+    and the character used for free cells. With solutions flag False the first line
+    is the header, as csv.DictReader() would take it.
 
+    :param lines: Lines read from the beginning of a file
+    :param solutions: A boolean value depending on flag given by the user
+    :return: Header list, delimiter and free cell character
+    :rtype: tuple
     """
 
-    STEP = 3
-    stats_dict = {"puzzle_l": [], "solution_l": []}
-    pattern_p = re.compile(r"(\d{81})")
-    pattern_s = re.compile(r"([1-9]{81})")
-    counter = 0
+    rows = [line.rstrip("\r\n") for line in lines if line.strip()]
+    if not solutions:
+        header = rows[0].split(",") if rows else []
+        return header, ",", find_blank(rows[1:])
+
+    if rows and is_header(rows[0]):
+        rows = rows[1:]
+    blank = find_blank(rows)
+    delimiter = max(
+        DELIMITERS, key=lambda mark: sum(len(row.split(mark)) == 2 for row in rows)
+    )
 
     # Check the file's rows to check where are puzzles and solutions.
-    for i in range(0, len(lines_loc), STEP):
-        counter += 1
-        line = re.split(r"(?<=\d),(?=\d)", fileops.linesread(file, lines_loc[i]))
+    counter = len(rows) or 1
+    puzzle_l = solution_l = 0
+    for row in rows:
+        line = row.replace(blank, "0").split(delimiter)
         if len(line) != 2:
             continue
-        if bool(pattern_p.match(line[0])) and bool(pattern_s.match(line[1])):
-            stats_dict["puzzle_l"].append(1)
-        if bool(pattern_s.match(line[0])) and bool(pattern_p.match(line[1])):
-            stats_dict["solution_l"].append(1)
-    puzzle_l = len(stats_dict["puzzle_l"]) / counter
-    solution_l = len(stats_dict["solution_l"]) / counter
-    if (
-        len(stats_dict["puzzle_l"]) / counter >= 0.67
-        and len(stats_dict["solution_l"]) / counter <= 0.33
-    ):
-        return ["puzzle", "solution"]
-    elif (
-        len(stats_dict["solution_l"]) / counter >= 0.67
-        and len(stats_dict["puzzle_l"]) / counter < 0.33
-    ):
-        return ["solution", "puzzle"]
+        if PAIR_PATTERNS["puzzle"].fullmatch(",".join(line)):
+            puzzle_l += 1
+        if PAIR_PATTERNS["solution"].fullmatch(",".join(line)):
+            solution_l += 1
+    puzzle_l /= counter
+    solution_l /= counter
+    if puzzle_l >= 0.67 and solution_l <= 0.33:
+        return ["puzzle", "solution"], delimiter, blank
+    elif solution_l >= 0.67 and puzzle_l < 0.33:
+        return ["solution", "puzzle"], delimiter, blank
     else:
         print(
             f"Your data is in mess. \n",
@@ -69,6 +81,31 @@ def determine_headers(file: str, lines_loc: list[int]) -> list[str]:
         sys.exit()
 
 
+def find_blank(rows: list[str]) -> str:
+    """
+    Returns the character used for free cells, the most common of BLANKS in given rows.
+
+    :param rows: Data rows read from a file, without the header
+    :return: Free cell character
+    :rtype: str
+    """
+
+    return max(BLANKS, key=lambda mark: sum(row.count(mark) for row in rows))
+
+
+def is_header(line: str) -> bool:
+    """
+    Returns True if a line read from a file is a header line.
+    A header line doesn't start with a digit or free cell mark.
+
+    :param line: A line read from a file
+    :return: True if it's a header, False if it's data
+    :rtype: bool
+    """
+
+    return line[:1] not in '0123456789."'
+
+
 def validate_rows(row: dict[str, str], header: list[str], solutions: bool) -> bool:
     """
     Returns True if row is valid or False if not.
@@ -80,9 +117,6 @@ def validate_rows(row: dict[str, str], header: list[str], solutions: bool) -> bo
     :rtype: bool
     """
 
-    # Set patterns
-    pattern_p = re.compile(r"(^\d{81}$)")
-    pattern_s = re.compile(r"(^[1-9]{81}$)")
     if header[0] == "puzzle":
         left_col = "puzzle"
     elif header[0] == "solution":
@@ -93,24 +127,10 @@ def validate_rows(row: dict[str, str], header: list[str], solutions: bool) -> bo
         line = [v for v in row.values()]
         if len(line) != 2:
             return False
-        if not line[0].isdigit() or not line[1].isdigit():
-            return False
         if left_col == "puzzle":
-            if (
-                not bool(pattern_p.match(line[0]))
-                or not bool(pattern_s.match(line[1]))
-                or "0" not in line[0]
-                or "0" in line[1]
-            ):
-                return False
+            return validate_pair(line[0], line[1])
         if left_col == "solution":
-            if (
-                not bool(pattern_s.match(line[0]))
-                or not bool(pattern_p.match(line[1]))
-                or "0" in line[0]
-                or "0" not in line[1]
-            ):
-                return False
+            return validate_pair(line[1], line[0])
 
     # Validation if solutions flag is False
     else:
@@ -118,18 +138,36 @@ def validate_rows(row: dict[str, str], header: list[str], solutions: bool) -> bo
             return False
         if len(row) != 1:
             return False
-        if not row[left_col].isdigit():
-            return False
-        if (
-            not bool(pattern_p.match(row[left_col]))
-            or bool(pattern_s.match(row[left_col]))
-            or "0" not in row[left_col]
-        ):
-            return False
+        return validate_puzzle(row[left_col])
 
     return True
 
 
+def validate_puzzle(puzzle: str) -> bool:
+    """
+    Returns True if a string is a puzzle. 81 digits with at least one 0 for a free cell.
+
+    :param puzzle: A string read from a file
+    :return: True if validation is positive, False if it's negative
+    :rtype: bool
+    """
+
+    return PUZZLE_PATTERN.fullmatch(puzzle) is not None and "0" in puzzle
+
+
+def validate_pair(puzzle: str, solution: str) -> bool:
+    """
+    Returns True if strings are a puzzle and a solution. Solution is 81 digits from 1 to 9.
+
+    :param puzzle: A string read from a file, expected to be a puzzle
+    :param solution: A string read from a file, expected to be a solution
+    :return: True if validation is positive, False if it's negative
+    :rtype: bool
+    """
+
+    return validate_puzzle(puzzle) and SOLUTION_PATTERN.fullmatch(solution) is not None
+
+
 def validate_date(chosen_date: str) -> bool:
     """
     Validates if a string is in valid date format, and a valid date.
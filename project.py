@@ -5,6 +5,7 @@ import datetime
 import re
 import sys
 import time
+import typing
 
 import helpers.dbops as dbops
 import helpers.fileops as fileops
@@ -20,8 +21,7 @@ def main():
     Main wrapper function containing all logic and loops.
     """
 
-
-    #set cwd for main folder
+    # set cwd for main folder
     miscellaneous.cwd_main_dir()
 
     # Consts
@@ -45,6 +45,14 @@ def main():
             "[-f FN] [-st] <- One of these is a must. Use -h or --help to see more details\n"
         )
         sys.exit()
+    if args.count < 0:
+        parser.error("argument --count: K can't be negative")
+    if args.jobs < 1:
+        parser.error("argument --jobs: N has to be at least 1")
+    if args.sample < 0:
+        parser.error("argument --sample: N can't be negative")
+    if args.cache_size < 1:
+        parser.error("argument --cache-size: N has to be at least 1")
 
     # Checks if this is True
     if args.statistics:
@@ -56,7 +64,19 @@ def main():
             f"Try using -h or --help flags to see more details\n"
         )
         sys.exit()
-    sudoku_data = fileops.read_file(args.filename, args.solutions)
+    if args.pack:
+        packed = fileops.pack_file(args.filename, args.pack, args.solutions)
+        sys.exit(f"{packed:,} puzzles packed into {args.pack}.\n")
+    if args.range or args.sample:
+        sudoku_data = fileops.stream_lines(
+            args.filename,
+            args.solutions,
+            args.range or slice(None),
+            args.sample,
+            args.seed,
+        )
+    else:
+        sudoku_data = fileops.stream_file(args.filename, args.solutions)
     if args.tests:
         test_pipeline(args, sudoku_data, DB_NAME)
 
@@ -70,64 +90,41 @@ def main():
     else:
         presentation_method = "to screen"
     solutions_found = 0
+    timeouts = 0
+    unique_solutions = 0
+    multiple_solutions = 0
     tstart = time.time()
 
-    # Main block
+    # Main block. Rows are read, validated, solved and written one after another,
+    # only batch solvers and worker processes take a chunk of them at a time.
+    # Puzzles solved before are taken from the solution cache unless --no-cache is used.
+    name, results, cache, details = start_solving(
+        args, sudoku_data, DB_NAME, not args.no_cache
+    )
+    if args.tofile:
+        if args.compress:
+            sink = fileops.ResultsSink(f"{fileops.RESULTS_FILE}.{args.compress}")
+        else:
+            sink = fileops.ResultsSink()
     progress = args.tofile
-    for entry in tqdm.tqdm(sudoku_data, desc="Testing...") if progress else sudoku_data:
-        base_grid = gridops.make_grid(entry)
+    for entry, solution, solution_status, solution_count, effort in (
+        tqdm.tqdm(results, desc="Testing...") if progress else results
+    ):
         if args.print:
             print("PUZZLE")
-            print(gridops.print_grid(base_grid))
-        match args.method:
-            case 1:
-                # Recursion and backtracking
-                name = "R&B"
-                free_fields = solvers.list_of_free_fields(base_grid)
-                solution_status = solvers.bact_r_solve(base_grid, free_fields)
-                solution = base_grid[:]
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 2:
-                # Boosted recursion and backtracking
-                name = "Boosted R&B"
-                solution_status = solvers.boost_bact_r_solve(
-                    base_grid, solvers.scan_for_valid_vals(base_grid)
-                )
-                solution = base_grid[:]
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 3:
-                # Dlxsudoku module from PyPl
-                name = "DLXSudoku"
-                solution = solvers.dlxsudoku_module(entry)
-                if "0" not in solution:
-                    solution_status = True
-                else:
-                    solution_status = False
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 4:
-                # Random walk...
-                name = "Random walk"
-                solution_status = solvers.random_walk(base_grid)
-                solution = base_grid[:]
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 5:
-                # Cake algorithm
-                name = "Cake algorithm"
-                solution = solvers.cake_algo(base_grid)
-                solution_status = solution
-                solution = base_grid[:]
-                num_of_ops += 1
-                solutions_found += 1
-            case _:
-                sys.exit("No such algorithm implemented, please check your input")
+            print(gridops.print_grid(gridops.make_grid(entry)))
+        num_of_ops += 1
+        if solution_status:
+            solutions_found += 1
+        elif solution_status is None:
+            timeouts += 1
+        if args.count:
+            if solution_count == 1:
+                unique_solutions += 1
+            elif solution_count > 1:
+                multiple_solutions += 1
+        if details is not None:
+            details.write(entry["puzzle"], effort)
         if args.print:
             print("SOLUTION")
             print(gridops.print_grid(solution))
@@ -139,18 +136,25 @@ def main():
                         f"Generated solution identical to provided one? -> {comparison}"
                     )
                 if args.tofile:
-                    fileops.write_to_file(entry, solution, name, comparison)
+                    sink.write(entry, solution, name, comparison, solution_count)
         else:
             if args.tofile:
-                fileops.write_to_file(entry, solution, name)
+                sink.write(entry, solution, name, solution_count=solution_count)
+    if args.tofile:
+        sink.close()
+    if cache is not None:
+        cache.close()
     tstop = time.time()
+    cache_hits = cache.hits if cache is not None else 0
+
+    end_if_empty(num_of_ops, details)
 
     # Some more stats
     telapsed = tstop - tstart
     avg_op_time = telapsed / num_of_ops
 
     # Write stats to db
-    dbops.write_to_db(
+    run_id = dbops.write_to_db(
         presentation_method,
         name,
         str(cur_date),
@@ -160,7 +164,13 @@ def main():
         solutions_found,
         avg_op_time,
         DB_NAME,
+        timeouts,
+        unique_solutions if args.count else None,
+        multiple_solutions if args.count else None,
+        cache_hits,
     )
+    if details is not None:
+        details.close(run_id)
 
     # Print stats to screen
     if args.tofile or args.print:
@@ -172,10 +182,88 @@ def main():
         print(f"{'Test duration time':<22}{': ':<}{telapsed:.8f}")
         print(f"{'Puzzles read':<22}{': ':<}{num_of_ops:,}")
         print(f"{'Solutions found':<22}{': ':<}{solutions_found:,}")
-        print(f"{'Avg. solve time':<22}{': ':<}{avg_op_time:.8f}\n")
+        print(f"{'Avg. solve time':<22}{': ':<}{avg_op_time:.8f}")
+        if args.count:
+            print(f"{'Unique solutions':<22}{': ':<}{unique_solutions:,}")
+            print(f"{'Multiple solutions':<22}{': ':<}{multiple_solutions:,}")
+        print(f"{'Timeouts':<22}{': ':<}{timeouts:,}")
+        print(f"{'Cache hits':<22}{': ':<}{cache_hits:,}\n")
         sys.exit("Program has ended.\n")
 
 
+def start_solving(
+    args: argparse.Namespace,
+    sudoku_data: typing.Iterable[dict[str, str]],
+    db_name: str,
+    use_cache: bool,
+) -> tuple[str, typing.Iterator[tuple], object, object]:
+    """
+    Checks the chosen solver and starts solving, the same way for every pipeline.
+    Solutions come from the solution cache when it's used and the solver allows it,
+    and per puzzle details go to the stats DB with --details.
+
+    :param args: Argparse Namespace
+    :param sudoku_data: Dicts containing sudoku puzzles and/or solutions, read lazily
+    :param db_name: Name of database file
+    :param use_cache: Whether puzzles solved before are looked up in the solution cache
+    :return: Solver name, stream of results, the solution cache and the details sink,
+    None for the ones not used
+    :rtype: tuple
+    """
+
+    solver = solvers.SOLVERS.get(args.method)
+    if solver is None:
+        sys.exit("No such algorithm implemented, please check your input")
+    name = solver["name"]
+    if args.count and solver["count"] is None:
+        sys.exit(
+            f"{name} can't count solutions. Methods which can: "
+            + ", ".join(
+                f"{number}. {other['name']}"
+                for number, other in solvers.SOLVERS.items()
+                if other["count"] is not None
+            )
+        )
+    options = {
+        "seed": args.seed,
+        "budget": args.budget,
+        "time_limit": args.time_limit,
+        "details": args.details,
+    }
+    cache = None
+    if not use_cache or args.count or not solver["cacheable"]:
+        results = solvers.solve_stream(
+            args.method, sudoku_data, options, args.count, args.jobs
+        )
+    else:
+        cache = dbops.SolutionCache(dbops.CACHE_NAME, args.cache_size)
+        results = cache.stream(
+            sudoku_data,
+            lambda misses: solvers.solve_stream(
+                args.method, misses, options, jobs=args.jobs
+            ),
+        )
+    details = dbops.DetailsSink(db_name) if args.details else None
+
+    return name, results, cache, details
+
+
+def end_if_empty(num_of_ops: int, details: object) -> None:
+    """
+    Ends the program without recording a run when no puzzles were read,
+    i.e. --range past the end of the file.
+
+    :param num_of_ops: How many puzzles were read
+    :param details: Details sink of the run, None without --details
+    """
+
+    if num_of_ops:
+        return
+    if details is not None:
+        details.discard()
+    sys.exit("No puzzles were read, nothing to solve. Check --range and the file.\n")
+
+
 def show_stats(db_name: str) -> None:
     """
     Main logic loop for CLS menu which gives the user the ability to brow solve stats,
@@ -197,26 +285,22 @@ def show_stats(db_name: str) -> None:
     if not table_present:
         sys.exit("No table with statistics available. Run som solve cycles first.\n")
 
+    # Stats DBs made by older versions have no indexes yet
+    dbops.create_indexes(cursor)
+    db_conn.commit()
+
     # Main menu loop and logic
     while True:
         miscellaneous.clear_screen()
         printops.print_main_menu()
         pick = input(">>> ")
-        pattern = re.compile(r"(^[1-5,0]$)")
+        pattern = re.compile(r"(^[1-6,0]$)")
         if not bool(pattern.match(pick)):
             continue
         miscellaneous.clear_screen()
         match pick:
             case "1":
-                dbops.get_data(db_name, "all")
-                while True:
-                    action = input(
-                        "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                    )
-                    if action.lower() == "b":
-                        break
-                    elif action == "0":
-                        dbops.termination(db_conn)
+                browse_stats(db_conn, "all")
             case "2":
                 while True:
                     miscellaneous.clear_screen()
@@ -227,39 +311,17 @@ def show_stats(db_name: str) -> None:
                             break
                         case "0":
                             dbops.termination(db_conn)
-                        case "1":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "test")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "2":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "file")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "3":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "screen")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
+                        case "1" | "2" | "3":
+                            presentation_method = (
+                                "test pipeline",
+                                "to file",
+                                "to screen",
+                            )
+                            browse_stats(
+                                db_conn,
+                                "presentation",
+                                presentation_method[int(action) - 1],
+                            )
             case "3":
                 while True:
                     miscellaneous.clear_screen()
@@ -270,73 +332,13 @@ def show_stats(db_name: str) -> None:
                             break
                         case "0":
                             dbops.termination(db_conn)
-                        case "1":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "R&B")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "2":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "Boosted R&B")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "3":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "DLXSudoku")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "4":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "Random walk")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
-                        case "5":
-                            miscellaneous.clear_screen()
-                            dbops.get_data(db_name, "Cake Algorithm")
-                            while True:
-                                action = input(
-                                    "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                                )
-                                if action.lower() == "b":
-                                    break
-                                elif action == "0":
-                                    dbops.termination(db_conn)
+                        case number if number in [str(key) for key in solvers.SOLVERS]:
+                            # Runs are stored under the registry name of their method
+                            name = solvers.SOLVERS[int(number)]["name"]
+                            browse_stats(db_conn, "method", name)
             case "4":
                 action = printops.print_date()
-                miscellaneous.clear_screen()
-                dbops.get_data(db_name, "date", action)
-                while True:
-                    action = input(
-                        "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
-                    )
-                    if action.lower() == "b":
-                        break
-                    elif action == "0":
-                        dbops.termination(db_conn)
+                browse_stats(db_conn, "date", action)
             case "5":
                 while True:
                     miscellaneous.clear_screen()
@@ -362,7 +364,7 @@ def show_stats(db_name: str) -> None:
                             elif len(action) < 1:
                                 continue
                             else:
-                                dbops.get_data(db_name, "delete", action)
+                                dbops.get_data(db_conn, "delete", action)
                         case "2":
                             miscellaneous.clear_screen()
                             printops.confirmation()
@@ -374,29 +376,109 @@ def show_stats(db_name: str) -> None:
                                     case "0":
                                         dbops.termination(db_conn)
                                     case "y":
-                                        dbops.get_data(db_name, "drop", "statistics")
+                                        dbops.get_data(db_conn, "drop")
                                         break
                                     case "n":
                                         break
                         case "3":
                             miscellaneous.clear_screen()
-                            fileops.db_to_file(db_name)
+                            fileops.db_to_file(db_conn)
                             print("DB copy to csv done.")
                             time.sleep(1)
+                        case "4":
+                            miscellaneous.clear_screen()
+                            saved = fileops.db_to_file(db_conn, incremental=True)
+                            print(f"{saved:,} new rows copied to csv.")
+                            time.sleep(1)
+            case "6":
+                while True:
+                    miscellaneous.clear_screen()
+                    printops.print_reports_menu()
+                    action = input("\n>>> ")
+                    match action.lower():
+                        case "b":
+                            break
+                        case "0":
+                            dbops.termination(db_conn)
+                        case "1":
+                            miscellaneous.clear_screen()
+                            dbops.get_report(db_conn)
+                        case "2":
+                            first_date = printops.print_date("first date")
+                            last_date = printops.print_date("last date")
+                            dbops.get_report(db_conn, first_date, last_date)
+                        case "3":
+                            miscellaneous.clear_screen()
+                            action = input(
+                                "\nWhich two rowids you want to compare? Separate them with a space.\n"
+                                "Type 'B' to return to previous menu or '0' to exit.\n\n>>> "
+                            )
+                            runs = action.split()
+                            if action.lower() == "b":
+                                continue
+                            elif action == "0":
+                                dbops.termination(db_conn)
+                            elif len(runs) != 2 or not "".join(runs).isdigit():
+                                continue
+                            miscellaneous.clear_screen()
+                            dbops.compare_runs(db_conn, int(runs[0]), int(runs[1]))
+                        case _:
+                            continue
+                    while True:
+                        action = input(
+                            "\nType 'B' to return to previous menu or '0' to exit.\n>>> "
+                        )
+                        if action.lower() == "b":
+                            break
+                        elif action == "0":
+                            dbops.termination(db_conn)
             case "0":
                 dbops.termination(db_conn)
             case _:
                 sys.exit(f"Something went wrong. Check what did you input {pick}")
 
 
+def browse_stats(db_conn: object, db_content: str, target="") -> None:
+    """
+    Shows chosen stats a page at a time, newest first,
+    and lets the user move to the next or previous page.
+
+    :param db_conn: SQLite3 connection object
+    :param db_content: What is to be read from the db
+    :param target: A str with the value to filter by
+    """
+
+    key, backwards = None, False
+    while True:
+        miscellaneous.clear_screen()
+        newer, older = dbops.get_data(db_conn, db_content, target, key, backwards)
+        while True:
+            action = input(
+                "\nType 'N' for next page, 'P' for previous page, "
+                "'B' to return to previous menu or '0' to exit.\n>>> "
+            ).lower()
+            if action == "b":
+                return
+            elif action == "0":
+                dbops.termination(db_conn)
+            elif action == "n" and older is not None:
+                key, backwards = older, False
+                break
+            elif action == "p" and newer is not None:
+                key, backwards = newer, True
+                break
+
+
 def test_pipeline(
-    args: argparse.Namespace, sudoku_data: list[dict[str, str]], db_name: str
+    args: argparse.Namespace,
+    sudoku_data: typing.Iterable[dict[str, str]],
+    db_name: str,
 ) -> None:
     """
     Test pipeline for sudoku algorithms. Elegant way for testing and writing to DB
 
     :param args: Argparse Namespace
-    :param sudoku_data: A dict containing sudoku puzzles and/or solutions
+    :param sudoku_data: Dicts containing sudoku puzzles and/or solutions, read lazily
     """
 
     # Creates stats variables, match case nad execute
@@ -406,59 +488,38 @@ def test_pipeline(
     cur_time = dt_obj.time().strftime("%H:%M:%S")
     presentation_method = "test pipeline"
     solutions_found = 0
+    timeouts = 0
+    unique_solutions = 0
+    multiple_solutions = 0
     tstart = time.time()
-    for entry in tqdm.tqdm(sudoku_data, desc="Testing..."):
-        base_grid = gridops.make_grid(entry)
-        match args.method:
-            case 1:
-                # Recursion and backtracking
-                name = "R&B"
-                free_fields = solvers.list_of_free_fields(base_grid)
-                solution_status = solvers.bact_r_solve(base_grid, free_fields)
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 2:
-                # Boosted recursion and backtracking
-                name = "Boosted R&B"
-                solution_status = solvers.boost_bact_r_solve(
-                    base_grid, solvers.scan_for_valid_vals(base_grid)
-                )
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 3:
-                # Dlxsudoku module from PyPl
-                name = "DLXSudoku"
-                solution = solvers.dlxsudoku_module(entry)
-                if "0" not in solution:
-                    solution_status = True
-                else:
-                    solution_status = False
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 4:
-                # Random walk...
-                name = "Random walk"
-                solution_status = solvers.random_walk(base_grid)
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case 5:
-                # Cake algorithm
-                name = "Cake algorithm"
-                solution = solvers.cake_algo(base_grid)
-                solution_status = solution
-                num_of_ops += 1
-                if solution_status:
-                    solutions_found += 1
-            case _:
-                sys.exit("No such algorithm implemented, please check your input")
+
+    # Test runs measure the solver, so the solution cache is used only with --cache.
+    name, results, cache, details = start_solving(
+        args, sudoku_data, db_name, args.cache
+    )
+    for entry, _, solution_status, solution_count, effort in tqdm.tqdm(
+        results, desc="Testing..."
+    ):
+        num_of_ops += 1
+        if solution_status:
+            solutions_found += 1
+        elif solution_status is None:
+            timeouts += 1
+        if args.count:
+            if solution_count == 1:
+                unique_solutions += 1
+            elif solution_count > 1:
+                multiple_solutions += 1
+        if details is not None:
+            details.write(entry["puzzle"], effort)
+    if cache is not None:
+        cache.close()
     tstop = time.time()
+    cache_hits = cache.hits if cache is not None else 0
+    end_if_empty(num_of_ops, details)
     telapsed = tstop - tstart
     avg_op_time = telapsed / num_of_ops
-    dbops.write_to_db(
+    run_id = dbops.write_to_db(
         presentation_method,
         name,
         str(cur_date),
@@ -468,7 +529,13 @@ def test_pipeline(
         solutions_found,
         avg_op_time,
         db_name,
+        timeouts,
+        unique_solutions if args.count else None,
+        multiple_solutions if args.count else None,
+        cache_hits,
     )
+    if details is not None:
+        details.close(run_id)
     if args.tofile or args.tests:
         print()
         print(f"{'Method of presentation':<22}{': ':<}{presentation_method}")
@@ -478,7 +545,12 @@ def test_pipeline(
         print(f"{'Test duration time':<22}{': ':<}{telapsed:.8f}")
         print(f"{'Puzzles read':<22}{': ':<}{num_of_ops:,}")
         print(f"{'Solutions found':<22}{': ':<}{solutions_found:,}")
-        print(f"{'Avg. solve time':<22}{': ':<}{avg_op_time:.8f}\n")
+        print(f"{'Avg. solve time':<22}{': ':<}{avg_op_time:.8f}")
+        if args.count:
+            print(f"{'Unique solutions':<22}{': ':<}{unique_solutions:,}")
+            print(f"{'Multiple solutions':<22}{': ':<}{multiple_solutions:,}")
+        print(f"{'Timeouts':<22}{': ':<}{timeouts:,}")
+        print(f"{'Cache hits':<22}{': ':<}{cache_hits:,}\n")
         sys.exit("Program has ended.\n")
 
 
@@ -498,20 +570,20 @@ def argparse_logic() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
         check statistics about solving process.""",
         epilog="For more information write at pokeplacek@gmail.com. Thank you for using!",
     )
+    methods = ", ".join(
+        f">> {number} << {solver['name']}, {solver['description']}"
+        for number, solver in solvers.SOLVERS.items()
+    )
     parser.add_argument(
         "-m",
         "--method",
         metavar="M",
         type=int,
         default=1,
-        choices=[1, 2, 3, 4, 5],
-        help="""Type in a number to choose the solver method.
-        Input an int in range {1-5}.
-        >> 1 << Recursion and backtracking,
-        >> 2 << Boosted recursion and backtracking looking ahead for available valid values,
-        >> 3 << Dlxsudoku module from PyPl,
-        >> 4 << Random walk... Use one very small data samples, preferably just one,
-        >> 5 << Cake algorithm.""",
+        choices=list(solvers.SOLVERS),
+        help=f"""Type in a number to choose the solver method.
+        Input an int in range {{{min(solvers.SOLVERS)}-{max(solvers.SOLVERS)}}}.
+        {methods}.""",
     )
     parser.add_argument(
         "-f",
@@ -543,6 +615,102 @@ def argparse_logic() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
         help="""If you have solutions to compare,
         you can check if solution generated is equal to solution provided.""",
     )
+    parser.add_argument(
+        "--seed",
+        metavar="S",
+        type=int,
+        default=None,
+        help="""Seed for the random walk method. Same seed, same walks.""",
+    )
+    parser.add_argument(
+        "--budget",
+        metavar="N",
+        type=int,
+        default=1_000_000,
+        help="""Random walk gives up a puzzle after N placed values and counts it as a timeout.
+        Use 0 for no limit.""",
+    )
+    parser.add_argument(
+        "--time-limit",
+        metavar="SEC",
+        type=float,
+        default=10.0,
+        help="""Random walk gives up a puzzle after SEC seconds and counts it as a timeout.
+        Use 0 for no limit.""",
+    )
+    parser.add_argument(
+        "--count",
+        metavar="K",
+        type=int,
+        default=0,
+        help="""Count solutions of every puzzle, stopping at K. Use 2 to check uniqueness.
+        Works with methods 6 and 8. Use 0 to just solve.""",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["gz", "bz2", "xz"],
+        help="""With -tf write results compressed, to results.csv.gz, .bz2 or .xz.
+        Compressed input files are recognised automatically.""",
+    )
+    parser.add_argument(
+        "--pack",
+        metavar="OUT",
+        help="""Convert puzzles (and solutions with -s) from FN into a packed binary file OUT,
+        and quit. Packed files are read much faster, use them with -f like any other file.""",
+    )
+    parser.add_argument(
+        "--range",
+        metavar="START:STOP",
+        type=miscellaneous.parse_range,
+        help="""Solve only puzzles from START to STOP, counted from 0 like Python slicing.
+        Write negative START as --range=-100:. Rows are looked up through a line index
+        saved next to the file (FN.idx).""",
+    )
+    parser.add_argument(
+        "--sample",
+        metavar="N",
+        type=int,
+        default=0,
+        help="""Solve N puzzles picked at random (from --range if given). Use --seed to repeat.""",
+    )
+    parser.add_argument(
+        "--details",
+        action="store_true",
+        default=False,
+        help="""Store latency, search nodes, backtracks and validator calls of every puzzle
+        in the stats DB, linked to the run. Counting slows search down, R&B up to twice.""",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="""Solve every puzzle, without looking solutions up in the solution cache (cache.db)
+        or storing new ones. Test runs (-t) don't use the cache unless --cache is given.""",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="""With -t, look solutions up in the solution cache too.
+        Test runs solve every puzzle by default, so their stats measure the solver.""",
+    )
+    parser.add_argument(
+        "--cache-size",
+        metavar="N",
+        type=int,
+        default=dbops.CACHE_SIZE,
+        help="""Keep at most N solutions in the solution cache,
+        least recently used ones are dropped first. Default is 1,000,000.""",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="""Solve puzzles in N worker processes. Results keep the order of the input file.
+        Default is 1, no workers.""",
+    )
     parser.add_argument(
         "-st",
         "--statistics",
@@ -1,12 +1,22 @@
+import array
+import bz2
 import contextlib
+import csv
+import datetime
+import gzip
 import io
+import lzma
 
 import pytest
+import random
+import sqlite3
 import sys
 
 import project
+from helpers import dbops
 from helpers import fileops
 from helpers import gridops
+from helpers import miscellaneous
 from helpers import printops
 from helpers import solvers
 from helpers import validateops
@@ -62,7 +72,7 @@ def test_print_other_actions_pos():
     :raise AssertionError: If function's output isn't exact match.
     """
 
-    func3 = "Choose what you want to do:\n    1. Drop a record.\n    2. Drop the table.\n    3. Save DB to file.\n\n    0. Exit program\n    B. Get back to previous menu"
+    func3 = "Choose what you want to do:\n    1. Drop a record.\n    2. Drop the table.\n    3. Save DB to file.\n    4. Save new rows to file of the day.\n\n    0. Exit program\n    B. Get back to previous menu"
 
     with contextlib.redirect_stdout(io.StringIO()) as buffer:
         printops.print_other_actions()
@@ -101,7 +111,7 @@ def test_print_main_menu_pos():
     :raise AssertionError: If function's output isn't exact match.
     """
 
-    func5 = "Choose what you want to do:\n    1. Show all stats.\n    2. Show stats for given presentation method only.\n    3. Show stats for given solve method only.\n    4. Show stats for given date.\n    5. Other actions.\n\n    0. Exit program."
+    func5 = "Choose what you want to do:\n    1. Show all stats.\n    2. Show stats for given presentation method only.\n    3. Show stats for given solve method only.\n    4. Show stats for given date.\n    5. Other actions.\n    6. Reports.\n\n    0. Exit program."
 
     with contextlib.redirect_stdout(io.StringIO()) as buffer:
         printops.print_main_menu()
@@ -179,7 +189,7 @@ def test_print_solve_menu_pos():
     :raise AssertionError: If function's output isn't exact match.
     """
 
-    func9 = "Choose solve method to display stats for:\n    1. R&B.\n    2. Boosted R&B.\n    3. DLXSudoku.\n    4. Random walk.\n    5. Cake Algorithm.\n\n    0. Exit program\n    B. Get back to previous menu"
+    func9 = "Choose solve method to display stats for:\n    1. R&B.\n    2. Boosted R&B.\n    3. DLXSudoku.\n    4. Random walk.\n    5. Cake Algorithm.\n    6. Bitmask CP.\n    7. Iterative R&B.\n    8. Algorithm X.\n    9. NumPy batch.\n\n    0. Exit program\n    B. Get back to previous menu"
 
     with contextlib.redirect_stdout(io.StringIO()) as buffer:
         printops.print_solve_menu()
@@ -282,6 +292,9 @@ def test_argparse_logic(monkeypatch):
         args.statistics == False
         args.solutions == True
         args.group.print == True
+    help_text = " ".join(parser.format_help().split())
+    assert all(solver["name"] in help_text for solver in solvers.SOLVERS.values())
+    assert f"range {{1-{len(solvers.SOLVERS)}}}" in help_text
     monkeypatch.setattr("sys.argv", ["project.py", "-f", "sudoku.txt"])
     args, parser = project.argparse_logic()
     assert args.method == 1
@@ -297,6 +310,66 @@ def test_argparse_logic(monkeypatch):
         args.group.tofile == False
 
 
+def test_start_solving(monkeypatch, tmp_path):
+    """
+    Checks if solving starts the same for every pipeline, with the solution cache
+    used only when asked for, and with a details sink for --details.
+
+    :param monkeypatch: Builtin Pytest functionality
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    monkeypatch.chdir(tmp_path)
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    db_name = str(tmp_path / "stats.db")
+    monkeypatch.setattr("sys.argv", ["project.py", "-f", "x.csv", "-m", "6", "-t"])
+    args, parser = project.argparse_logic()
+    name, results, cache, details = project.start_solving(
+        args, iter([{"puzzle": unique}]), db_name, args.cache
+    )
+    assert name == "Bitmask CP" and cache is None and details is None
+    assert next(results)[2]
+
+    argv = ["project.py", "-f", "x.csv", "-m", "6", "-t", "--cache", "--details"]
+    monkeypatch.setattr("sys.argv", argv)
+    args, parser = project.argparse_logic()
+    for hits in (0, 1):
+        name, results, cache, details = project.start_solving(
+            args, iter([{"puzzle": unique}]), db_name, args.cache
+        )
+        assert next(results)[2]
+        cache.close()
+        details.close(1)
+        assert cache.hits == hits
+
+    argv = ["project.py", "-f", "x.csv", "-m", "5", "--count", "2"]
+    monkeypatch.setattr("sys.argv", argv)
+    args, parser = project.argparse_logic()
+    with pytest.raises(SystemExit):
+        project.start_solving(args, iter([]), db_name, True)
+
+
+def test_end_if_empty(tmp_path):
+    """
+    Checks if a run without puzzles ends with a message and leaves no details behind.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    db_name = str(tmp_path / "stats.db")
+    details = dbops.DetailsSink(db_name)
+    project.end_if_empty(1, details)
+    details.write("0" * 81, None)
+    details.flush()
+    with pytest.raises(SystemExit, match="No puzzles were read"):
+        project.end_if_empty(0, details)
+    db_conn = sqlite3.connect(db_name)
+    assert db_conn.execute("SELECT count(*) FROM puzzle_details").fetchone() == (0,)
+    db_conn.close()
+
+
 def test_validate_file():
     """
     Validates whether a file exists and if it is a file indeed.
@@ -313,24 +386,155 @@ def test_validate_file():
     assert validateops.validate_file("shirtificate.png") == False
 
 
-def test_linesread():
+def test_stream_file(tmp_path):
+    """
+    Checks if rows are streamed one by one, skipping bad ones, with swapped columns
+    and quoted lines handled, and if a file full of bad rows is refused
+    before it's read to the end.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    rows = fileops.stream_file("sudoku.txt", False)
+    assert next(rows) == {
+        "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    }
+    assert len(list(rows)) + 1 == len(fileops.read_file("sudoku.txt", False))
+    puzzle = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    solution = "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    swapped_file = tmp_path / "swapped.csv"
+    swapped_file.write_text(
+        "solution,puzzle\n"
+        + f"{solution},{puzzle}\n" * 9
+        + f'"{solution}","{puzzle}"\r\n'
+        + f"{solution},{solution}\n"
+    )
+    rows = list(fileops.stream_file(str(swapped_file), True))
+    assert rows == [{"puzzle": puzzle, "solution": solution}] * 10
+    assert validateops.validate_pair(puzzle, solution)
+    assert not validateops.validate_pair(solution, puzzle)
+    assert not validateops.validate_puzzle(puzzle + "\n")
+    dotted_file = tmp_path / "dotted.csv"
+    dotted_file.write_text(f"{puzzle.replace('0', '.')};{solution}\n" * 3)
+    rows = list(fileops.stream_file(str(dotted_file), True))
+    assert rows == [{"puzzle": puzzle, "solution": solution}] * 3
+    bad_file = tmp_path / "bad.txt"
+    bad_file.write_text("puzzle\n" + "123\n" * (fileops.BAD_ROWS_SAMPLE + 100))
+    rows = fileops.stream_file(str(bad_file), False)
+    with pytest.raises(SystemExit):
+        for _ in range(fileops.BAD_ROWS_SAMPLE):
+            next(rows)
+
+
+def test_stream_lines(tmp_path):
+    """
+    Checks if chosen rows are read through the line offset index, if the index is saved
+    next to the file, and if it's built again after the file has changed.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    data_file = tmp_path / "sudoku.csv"
+    data_file.write_text(open("sudoku.csv").read())
+    everything = fileops.read_file("sudoku.csv", True)
+    rows = list(fileops.stream_lines(str(data_file), True, slice(100, 110)))
+    assert rows == everything[100:110]
+    assert validateops.validate_file(f"{data_file}.idx")
+    assert len(fileops.line_index(str(data_file))) == len(everything) + 2
+    rows = list(fileops.stream_lines(str(data_file), True, slice(-3, None)))
+    assert rows == everything[-3:]
+    rows = list(fileops.stream_lines(str(data_file), True, slice(None), 5, 1))
+    assert len(rows) == 5 and all(row in everything for row in rows)
+    assert rows == list(fileops.stream_lines(str(data_file), True, slice(None), 5, 1))
+    data_file.write_text("puzzle\n" + everything[7]["puzzle"] + "\n")
+    assert list(fileops.stream_lines(str(data_file), False)) == [
+        {"puzzle": everything[7]["puzzle"]}
+    ]
+    assert miscellaneous.parse_range("10:20") == slice(10, 20)
+    assert miscellaneous.parse_range(":-5") == slice(None, -5)
+    with pytest.raises(ValueError):
+        miscellaneous.parse_range("10")
+
+
+def test_pack_file(tmp_path):
     """
-    Checks if string returned is of 163 chars length and presence of 0
+    Checks if a packed file gives back the same rows as the text file it was made from,
+    if it's recognised by its magic bytes, and if chosen rows are read from it.
+    A file can't be packed into itself.
 
-    The length is fixed for every line, because of the tested file's construction.
-    Every line is built of sudoku puzzle and solution separated by comma.
-    If all elements are present it means that tested function returned proper line for further
-    processing.
-    Every line should be of 163 chars long, contain 0 only in the left part.
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
 
+    packed = str(tmp_path / "sudoku.sdk")
+    everything = fileops.read_file("sudoku.csv", True)
+    assert fileops.pack_file("sudoku.csv", packed, True) == len(everything)
+    assert fileops.is_packed(packed)
+    assert not fileops.is_packed("sudoku.csv")
+    assert fileops.read_file(packed, True) == everything
+    assert fileops.read_file(packed, False) == [
+        {"puzzle": row["puzzle"]} for row in everything
+    ]
+    rows = list(fileops.stream_lines(packed, True, slice(100, 103)))
+    assert rows == everything[100:103]
+    records, has_solutions = fileops.load_packed(packed)
+    assert records.shape == (len(everything), 82) and has_solutions
+    grids = [row["solution"] for row in everything[:3]]
+    unpacked = fileops.unpack_grids(fileops.pack_grids(grids)) + gridops.FREE
+    assert unpacked.tobytes().decode() == "".join(grids)
+    puzzles_only = str(tmp_path / "puzzles.sdk")
+    fileops.pack_file("sudoku.txt", puzzles_only, False)
+    with pytest.raises(SystemExit):
+        fileops.read_file(puzzles_only, True)
+
+    # Packing a file into itself, by any path, would empty it first.
+    link = tmp_path / "link.csv"
+    link.symlink_to(tmp_path / "puzzles.sdk")
+    roundabout = f"{tmp_path}/../{tmp_path.name}/puzzles.sdk"
+    for target in (puzzles_only, str(link), roundabout):
+        with pytest.raises(SystemExit):
+            fileops.pack_file(puzzles_only, target, False)
+    assert fileops.is_packed(puzzles_only)
+
+
+def test_compressed_files(tmp_path):
+    """
+    Checks if gzip, bz2 and xz files are read like plain ones, recognised by magic bytes
+    and not by extension, and if results are written compressed with the header once.
+
+    :param tmp_path: Builtin Pytest functionality
     :raises AssertionError: If test isn't valid
     """
 
-    assert len(fileops.linesread("sudoku.csv", 16)) == 163
-    assert len(fileops.linesread("sudoku.csv", 180)) == 163
-    assert len(fileops.linesread("sudoku.csv", 344).split(",")) == 2
-    assert "0" in fileops.linesread("sudoku.csv", 836).split(",")[0]
-    assert "0" not in fileops.linesread("sudoku.csv", 836).split(",")[1]
+    text = b"".join(open("sudoku.csv", "rb").readlines()[:301])
+    plain_file = tmp_path / "sudoku.csv"
+    plain_file.write_bytes(text)
+    everything = fileops.read_file(str(plain_file), True)
+    for opener, kind in ((gzip.open, "gzip"), (bz2.open, "bz2"), (lzma.open, "xz")):
+        data_file = str(tmp_path / f"sudoku_{kind}.dat")
+        with opener(data_file, "wb") as f:
+            f.write(text)
+        assert fileops.compression(data_file) == kind
+        assert fileops.read_file(data_file, True) == everything
+        rows = list(fileops.stream_lines(data_file, True, slice(10, 13)))
+        assert rows == everything[10:13]
+        rows = list(fileops.stream_lines(data_file, True, slice(None), 4, 1))
+        assert rows == list(
+            fileops.stream_lines(str(plain_file), True, slice(None), 4, 1)
+        )
+    assert fileops.compression("sudoku.csv") is None
+    assert fileops.compression("results.csv.xz", "a") == "xz"
+
+    results = str(tmp_path / "results.csv.gz")
+    grid = gridops.make_grid({"puzzle": everything[0]["solution"]})
+    for _ in range(2):
+        with fileops.ResultsSink(results) as sink:
+            sink.write(everything[0], grid, "Bitmask CP", True, 1)
+    lines = gzip.open(results, "rt").read().splitlines()
+    assert len(lines) == 3
+    assert lines[0] == ",".join(fileops.RESULTS_FIELDS)
 
 
 def test_open_file():
@@ -370,17 +574,9 @@ def test_grid_to_str():
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [
-        ["0", "7", "0", "0", "0", "0", "0", "4", "3"],
-        ["0", "4", "0", "0", "0", "9", "6", "1", "0"],
-        ["8", "0", "0", "6", "3", "4", "9", "0", "0"],
-        ["0", "9", "4", "0", "5", "2", "0", "0", "0"],
-        ["3", "5", "8", "4", "6", "0", "0", "2", "0"],
-        ["0", "0", "0", "8", "0", "0", "5", "3", "0"],
-        ["0", "8", "0", "0", "7", "0", "0", "9", "1"],
-        ["9", "0", "2", "1", "0", "0", "0", "0", "5"],
-        ["0", "0", "7", "0", "4", "0", "8", "0", "2"],
-    ]
+    grid = bytearray(
+        b"070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    )
 
     assert (
         gridops.grid_to_str(grid)
@@ -392,32 +588,108 @@ def test_grid_to_str():
     )
 
 
+def test_canonical_form():
+    """
+    Checks if relabeled, transposed and reordered puzzles share a canonical form,
+    and if solutions are mapped onto it and back.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    puzzle = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    solution = "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    form, transform = gridops.canonical_form(puzzle)
+    assert form.count("0") == puzzle.count("0")
+    assert gridops.from_canonical(form, transform) == puzzle
+    canonical_solution = gridops.to_canonical(solution, transform)
+    assert gridops.from_canonical(canonical_solution, transform) == solution
+    transposed = "".join(puzzle[col * 9 + row] for row in range(9) for col in range(9))
+    bands = transposed[54:] + transposed[:54]
+    relabeled = bands.translate(str.maketrans("123456789", "345678912"))
+    for variant in (transposed, bands, relabeled):
+        variant_form, variant_transform = gridops.canonical_form(variant)
+        assert variant_form == form
+        mapped = gridops.from_canonical(canonical_solution, variant_transform)
+        assert all(given in ("0", digit) for given, digit in zip(variant, mapped))
+    assert len(gridops.canonical_forms([puzzle, relabeled, "0" * 81])) == 3
+    assert gridops.canonical_form("0" * 81)[0] == "0" * 81
+
+
 def test_find_empty():
     """
-    Test if output is a tuple with row and col of the first free field.
+    Test if output is the cell number of the first free field.
 
     Crucial functionality for sudoku validator.
 
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [["0" for _ in range(9)] for _ in range(9)]
-    assert solvers.find_empty(grid) == (0, 0)
+    grid = bytearray(b"0" * 81)
+    assert solvers.find_empty(grid) == 0
 
 
 def test_find_full():
     """
-    Test if output is a tuple with row and col of the first occupied field.
+    Test if output is None when there is no free field.
 
     Crucial functionality for sudoku validator.
 
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [["1" for _ in range(9)] for _ in range(9)]
+    grid = bytearray(b"1" * 81)
     assert solvers.find_empty(grid) == None
 
 
+def test_peers():
+    """
+    Checks precomputed lookup tables. Every cell has 20 peers, peers are mutual,
+    and every cell belongs to one row, one column and one 3x3 square.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    assert all(len(peers) == 20 for peers in solvers.PEERS)
+    assert all(
+        cell in solvers.PEERS[peer] for cell in range(81) for peer in solvers.PEERS[cell]
+    )
+    assert solvers.PEERS[0][:10] == (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+    assert 80 not in solvers.PEERS[0]
+    assert solvers.UNITS_OF[40] == (4, 13, 22)
+    assert solvers.UNITS[22] == (30, 31, 32, 39, 40, 41, 48, 49, 50)
+
+
+def test_solver_registry():
+    """
+    Checks if every registered solver declares what pipelines need,
+    and solves the same puzzle through the registry.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    puzzle = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    solution = "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    options = {"rng": random.Random(1), "budget": 0, "time_limit": 0.0}
+    assert list(solvers.SOLVERS) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+    for number, solver in solvers.SOLVERS.items():
+        assert {"name", "solve", "prepare", "count", "setup"} <= solver.keys()
+        assert {"batchable", "parallel_safe", "deterministic"} <= solver.keys()
+        assert "cacheable" in solver
+        if number == 5:
+            continue
+        grid = gridops.make_grid({"puzzle": puzzle})
+        if solver["setup"] is not None:
+            solver["setup"]()
+        if solver["batchable"]:
+            assert solvers.run_batch(solver, [grid]) == [True]
+        else:
+            assert solvers.run_solver(solver, grid, options)
+        assert gridops.grid_to_str(grid) == solution
+    assert not solvers.SOLVERS[4]["deterministic"]
+    assert solvers.SOLVERS[9]["batchable"]
+    assert not solvers.SOLVERS[5]["cacheable"]
+
+
 def test_validator():
     """
     Tests if validator is returning right boolean output
@@ -428,20 +700,13 @@ def test_validator():
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [
-        ["0", "7", "0", "0", "0", "0", "0", "4", "3"],
-        ["0", "4", "0", "0", "0", "9", "6", "1", "0"],
-        ["8", "0", "0", "6", "3", "4", "9", "0", "0"],
-        ["0", "9", "4", "0", "5", "2", "0", "0", "0"],
-        ["3", "5", "8", "4", "6", "0", "0", "2", "0"],
-        ["0", "0", "0", "8", "0", "0", "5", "3", "0"],
-        ["0", "8", "0", "0", "7", "0", "0", "9", "1"],
-        ["9", "0", "2", "1", "0", "0", "0", "0", "5"],
-        ["0", "0", "7", "0", "4", "0", "8", "0", "2"],
-    ]
+    grid = bytearray(
+        b"070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    )
 
-    assert solvers.validator(grid, "1", (0, 0)) == True
-    assert solvers.validator(grid, "3", (0, 0)) == False
+    assert solvers.validator(grid, ord("1"), 0) == True
+    assert solvers.validator(grid, ord("3"), 0) == False
+    assert solvers.validator(grid, ord("2"), 80) == True
 
 
 def test_bact_r_solve():
@@ -454,21 +719,591 @@ def test_bact_r_solve():
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [
-        ["0", "7", "0", "0", "0", "0", "0", "4", "3"],
-        ["0", "4", "0", "0", "0", "9", "6", "1", "0"],
-        ["8", "0", "0", "6", "3", "4", "9", "0", "0"],
-        ["0", "9", "4", "0", "5", "2", "0", "0", "0"],
-        ["3", "5", "8", "4", "6", "0", "0", "2", "0"],
-        ["0", "0", "0", "8", "0", "0", "5", "3", "0"],
-        ["0", "8", "0", "0", "7", "0", "0", "9", "1"],
-        ["9", "0", "2", "1", "0", "0", "0", "0", "5"],
-        ["0", "0", "7", "0", "4", "0", "8", "0", "2"],
-    ]
+    grid = bytearray(
+        b"070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    )
     free_fields = solvers.list_of_free_fields(grid)
     assert solvers.bact_r_solve(grid, free_fields) == True
 
 
+def test_boost_bact_r_solve():
+    """
+    Checks if boosted solver finds the solution while branching on the most constrained
+    field, and if taking a value back restores possible values of its neighbours.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    grid = gridops.make_grid(
+        {
+            "puzzle": "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+        }
+    )
+    valid_vals = solvers.scan_for_valid_vals(grid)
+    assert ord("8") not in valid_vals[10]
+    valid_vals.pop(1)
+    removed = solvers.eliminate_candidate(valid_vals, 1, ord("1"))
+    assert 9 in removed and 10 in removed and 2 not in removed
+    assert ord("1") not in valid_vals[9]
+    assert solvers.boost_bact_r_solve(grid, solvers.scan_for_valid_vals(grid))
+    assert (
+        gridops.grid_to_str(grid)
+        == "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+    )
+
+
+def test_stack_solve():
+    """
+    Checks if the explicit stack engine solves a grid in one go,
+    and if a paused search resumed with the same stack ends with the same solution.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    puzzle = {
+        "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    }
+    grid = gridops.make_grid(puzzle)
+    assert solvers.stack_solve(grid, solvers.list_of_free_fields(grid))
+    assert (
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+    grid = gridops.make_grid(puzzle)
+    free_fields = solvers.list_of_free_fields(grid)
+    valid_vals = solvers.scan_for_valid_vals(grid)
+    stack = array.array("b", [0])
+    assert solvers.stack_solve(grid, free_fields, valid_vals, stack, max_steps=5) is None
+    assert 1 < len(stack) <= 6
+    assert solvers.stack_solve(grid, free_fields, valid_vals, stack)
+    assert (
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+
+
+def test_boost_stack_solve():
+    """
+    Checks if boosted R&B on an explicit stack finds the same solution as the recursive one,
+    and gives up a puzzle without a solution leaving its free fields free.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    for puzzle in (
+        "070000043040009610800634900094052000358460020000800530080070091902100005007040802",
+        "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    ):
+        grid = gridops.make_grid({"puzzle": puzzle})
+        expected = gridops.make_grid({"puzzle": puzzle})
+        assert solvers.boost_bact_r_solve(expected, solvers.scan_for_valid_vals(expected))
+        assert solvers.boost_stack_solve(grid, solvers.scan_for_valid_vals(grid))
+        assert grid == expected
+    # The only solution has 7 in the second cell.
+    puzzle = "010000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    grid = gridops.make_grid({"puzzle": puzzle})
+    free = solvers.list_of_free_fields(grid)
+    assert not solvers.boost_stack_solve(grid, solvers.scan_for_valid_vals(grid))
+    assert solvers.list_of_free_fields(grid) == free
+
+
+def test_bitmask_solve():
+    """
+    Checks if bitmask solver fills the grid with the solution provided in the dataset,
+    and refuses a grid which breaks the rules from the start.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    grid = gridops.make_grid(
+        {
+            "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+        }
+    )
+    assert solvers.bitmask_solve(grid)
+    assert (
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+    grid = gridops.make_grid(
+        {
+            "puzzle": "770000043040009610800634900094052000358460020000800530080070091902100005007040802"
+        }
+    )
+    assert not solvers.bitmask_solve(grid)
+
+
+def test_exact_cover_solve():
+    """
+    Checks if Algorithm X solves the grid, and if the shared matrix is left untouched
+    after both a broken and a valid puzzle, so it can be reused by the next one.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    grid = gridops.make_grid(
+        {
+            "puzzle": "770000043040009610800634900094052000358460020000800530080070091902100005007040802"
+        }
+    )
+    assert not solvers.exact_cover_solve(grid)
+    grid = gridops.make_grid(
+        {
+            "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+        }
+    )
+    assert solvers.exact_cover_solve(grid)
+    assert (
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+    columns, rows = solvers.exact_cover_matrix()
+    assert len(columns) == 324
+    assert all(len(choices) == 9 for choices in columns.values())
+
+
+def test_count_solutions():
+    """
+    Checks if counting solvers tell a unique puzzle from one with two solutions,
+    and stop at the limit on an empty grid which has billions of them.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    double = "679518243543729618821634957094350186358461729016890534485276391962183475137945862"
+    for count in (solvers.bitmask_count, solvers.exact_cover_count):
+        assert count(gridops.make_grid({"puzzle": unique}), 2) == 1
+        assert count(gridops.make_grid({"puzzle": double}), 5) == 2
+        grid = gridops.make_grid({"puzzle": double})
+        assert count(grid, 2) == 2
+        assert solvers.bitmask_count(grid, 2) == 1
+        assert count(gridops.make_grid({"puzzle": "0" * 81}), 7) == 7
+        assert count(gridops.make_grid({"puzzle": "11" + "0" * 79}), 2) == 0
+
+
+def test_parallel_solve(monkeypatch):
+    """
+    Checks if puzzles solved by worker processes come back in input order,
+    across more chunks than the pool takes at once, with counting working too.
+
+    :param monkeypatch: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    broken = "770000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    double = "679518243543729618821634957094350186358461729016890534485276391962183475137945862"
+    puzzles = [unique, broken, double] * 4
+    options = {"seed": 1, "budget": 0, "time_limit": 0.0}
+    monkeypatch.setattr(solvers, "CHUNK_SIZE", 2)
+    entries = [{"puzzle": puzzle} for puzzle in puzzles]
+    results = list(solvers.parallel_solve(6, iter(entries), 2, options))
+    assert [entry for entry, _, _, _, _ in results] == entries
+    assert [status for _, _, status, _, _ in results] == [True, False, True] * 4
+    assert all(
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+        for _, grid, _, _, _ in results[::3]
+    )
+    results = list(solvers.parallel_solve(8, iter(entries), 2, options, 2))
+    assert [count for _, _, _, count, _ in results] == [1, 0, 2] * 4
+
+
+def test_solve_stream(monkeypatch):
+    """
+    Checks if streaming solve stage yields every entry with its result in order,
+    for a single puzzle solver, a batch solver split into chunks, and counting.
+
+    :param monkeypatch: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    broken = "770000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    entries = [{"puzzle": unique}, {"puzzle": broken}] * 3
+    options = {"seed": 1, "budget": 0, "time_limit": 0.0}
+    monkeypatch.setattr(solvers, "BATCH_SIZE", 4)
+    for number in (1, 6, 9):
+        results = list(solvers.solve_stream(number, iter(entries), options))
+        assert [entry for entry, _, _, _, _ in results] == entries
+        assert [bool(status) for _, _, status, _, _ in results] == [True, False] * 3
+    results = solvers.solve_stream(6, iter(entries), options, 2)
+    assert [count for _, _, _, count, _ in results] == [1, 0] * 3
+    assert list(solvers.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_puzzle_details(tmp_path):
+    """
+    Checks if latency and search effort are measured for every puzzle when asked for,
+    and written to the stats DB linked to the run. Rows of killed runs must be cleared.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    entries = [{"puzzle": unique}] * 2
+    options = {"seed": 1, "budget": 0, "time_limit": 0.0}
+    assert all(
+        effort is None for *_, effort in solvers.solve_stream(6, iter(entries), options)
+    )
+    options["details"] = True
+    for number in (1, 2, 4, 6, 7, 8):
+        for *_, effort in solvers.solve_stream(number, iter(entries), options):
+            latency, nodes, backtracks, validator_calls = effort
+            assert latency > 0 and nodes > 0 and 0 <= backtracks < nodes
+            assert validator_calls > 0 if number in (1, 4) else validator_calls == 0
+    *_, effort = next(solvers.solve_stream(3, iter(entries), options))
+    assert effort[0] > 0 and effort[1:] == (None, None, None)
+    *_, effort = next(solvers.solve_stream(9, iter(entries), options))
+    assert effort is None
+    *_, effort = next(solvers.parallel_solve(1, iter(entries), 2, options))
+    assert effort[1] > 0
+    assert solvers.SOLVERS[1]["solve"] is solvers.bact_r_solve
+
+    # Runs made at the same time, one of them interrupted, keep apart.
+    db_name = str(tmp_path / "stats.db")
+    details, other, interrupted = (dbops.DetailsSink(db_name, 1) for _ in range(3))
+    details.write(unique, (1_000, 2, 1, 30))
+    other.write(unique, (5_000, 3, 0, 40))
+    interrupted.write(unique, (7_000, 3, 0, 40))
+    details.write(unique, None)
+    run_id = dbops.write_to_db(
+        "to file", "R&B", "2026-10-18", "12:00:00", 1.0, 2, 2, 0.5, db_name
+    )
+    details.close(run_id)
+    interrupted.discard()
+    other_id = dbops.write_to_db(
+        "to file", "R&B", "2026-10-18", "12:00:01", 1.0, 1, 1, 0.5, db_name
+    )
+    other.close(other_id)
+    db_conn = sqlite3.connect(db_name)
+    rows = db_conn.execute(
+        """SELECT run_id, puzzle_number, latency_ns, validator_calls FROM puzzle_details
+        ORDER BY run_id, puzzle_number"""
+    ).fetchall()
+    assert rows == [
+        (run_id, 1, 1_000, 30),
+        (run_id, 2, None, None),
+        (other_id, 1, 5_000, 40),
+    ]
+
+    # Rows of killed runs, and of runs without a token, go when the next run starts.
+    killed = dbops.DetailsSink(db_name, 1)
+    killed.write(unique, (7_000, 3, 0, 40))
+    running = dbops.DetailsSink(db_name, 1)
+    running.write(unique, (7_000, 3, 0, 40))
+    db_conn.execute(
+        "UPDATE details_tokens SET pid = ?, started = 0 WHERE token = ?",
+        (2**22 + 1, killed.token),
+    )
+    db_conn.execute("INSERT INTO puzzle_details(run_id) VALUES(-5)")
+    db_conn.commit()
+    dbops.DetailsSink(db_name).discard()
+    tokens = db_conn.execute(
+        "SELECT DISTINCT run_id FROM puzzle_details WHERE run_id < 0"
+    ).fetchall()
+    assert tokens == [(running.token,)]
+    running.discard()
+    killed.discard()
+    db_conn.close()
+
+
+def test_report_rows(tmp_path):
+    """
+    Checks if reports give nearest rank latency percentiles and throughput
+    for every solve method, and for chosen runs.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    db_name = str(tmp_path / "stats.db")
+    runs = []
+    for method, date, latencies, cache_hits in (
+        ("R&B", "2026-10-17", range(1, 101), 0),
+        ("R&B", "2026-10-18", range(101, 201), 0),
+        ("Bitmask CP", "2026-10-18", (), 60),
+    ):
+        details = dbops.DetailsSink(db_name)
+        for latency in latencies:
+            details.write("0" * 81, (latency * 1_000_000, 10, 1, 5))
+        stats = ("test pipeline", method, date, "12:00:00", 2.0, 100, 100, 0.02)
+        run_id = dbops.write_to_db(*stats, db_name, cache_hits=cache_hits)
+        details.close(run_id)
+        runs.append(run_id)
+
+    cursor, db_conn = dbops.conn_to_db(db_name)
+    rows = dbops.report_rows(cursor, "solve_method", "test_date >= ?", ("0",))
+    # Puzzles taken from the cache don't count for throughput.
+    assert rows[0] == ("Bitmask CP", 1, 100, 20.0, None, None, None, None, None)
+    assert rows[1][:4] == ("R&B", 2, 200, 50.0)
+    assert rows[1][4:8] == (100.0, 180.0, 198.0, 200.0)
+    rows = dbops.report_rows(cursor, "run_id", "rowid IN (?, ?)", tuple(runs[:2]))
+    assert [row[4] for row in rows] == [50.0, 150.0]
+    assert rows[0][8] == pytest.approx(10 * 100 * 1e9 / (5050 * 1e6))
+    condition = "test_date BETWEEN ? AND ?"
+    rows = dbops.report_rows(cursor, "solve_method", condition, ("2026-10-17",) * 2)
+    assert [row[:2] for row in rows] == [("R&B", 1)]
+    db_conn.close()
+
+
+def test_get_data(capsys, tmp_path):
+    """
+    Checks if browsing filters by equality on indexed columns,
+    and if one connection serves the whole session, deletes included.
+
+    :param capsys: Builtin Pytest functionality
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    db_name = str(tmp_path / "stats.db")
+    for presentation, method, date in (
+        ("test pipeline", "R&B", "2026-10-17"),
+        ("to file", "Cake algorithm", "2026-10-18"),
+        ("to screen", "R&B", "2026-10-18"),
+    ):
+        dbops.write_to_db(
+            presentation, method, date, "12:00:00", 2.0, 100, 100, 0.02, db_name
+        )
+
+    cursor, db_conn = dbops.conn_to_db(db_name)
+    for column, value in (
+        ("solve_method", "R&B"),
+        ("presentation_method", "to file"),
+        ("test_date", "2026-10-18"),
+    ):
+        cursor.execute(
+            f"""EXPLAIN QUERY PLAN SELECT rowid, * FROM statistics WHERE {column} = ?
+            {dbops.NEWEST_FIRST}""",
+            (value,),
+        )
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+
+    dbops.get_data(db_conn, "method", "Cake algorithm")
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert len(lines) == 1 and "to file" in lines[0]
+    dbops.get_data(db_conn, "presentation", "to screen")
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert len(lines) == 1 and "2026-10-18" in lines[0]
+    dbops.get_data(db_conn, "delete", "3")
+    dbops.get_data(db_conn, "date", "2026-10-18")
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert len(lines) == 1 and "Cake algorithm" in lines[0]
+    db_conn.close()
+
+
+def test_get_data_pages(capsys, tmp_path):
+    """
+    Checks if browsing pages go newest first without gaps or repeats,
+    runs started at the same time included, and if previous pages lead back.
+
+    :param capsys: Builtin Pytest functionality
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    db_name = str(tmp_path / "stats.db")
+    for run in range(7):
+        # Runs started in the same second differ only by rowid.
+        start = f"12:00:0{run // 2}"
+        dbops.write_to_db(
+            "test pipeline", "R&B", "2026-10-18", start, 2.0, 100, 100, 0.02, db_name
+        )
+
+    cursor, db_conn = dbops.conn_to_db(db_name)
+    pages, keys = [], []
+    newer, older = None, None
+    while True:
+        newer, older = dbops.get_data(db_conn, "all", "", older, page_size=3)
+        lines = capsys.readouterr().out.splitlines()[2:]
+        pages.append([int(line.split()[0]) for line in lines])
+        keys.append(newer)
+        if older is None:
+            break
+    assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+    assert keys[0] is None
+
+    newer, older = dbops.get_data(db_conn, "all", "", keys[2], True, page_size=3)
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert [int(line.split()[0]) for line in lines] == [4, 3, 2]
+    newer, older = dbops.get_data(db_conn, "all", "", newer, True, page_size=3)
+    lines = capsys.readouterr().out.splitlines()[2:]
+    assert [int(line.split()[0]) for line in lines] == [7, 6, 5]
+    assert newer is None and older == ("2026-10-18", "12:00:02", 5)
+    db_conn.close()
+
+
+def test_db_to_file(capsys, monkeypatch, tmp_path):
+    """
+    Checks if DB dump holds every run once, and if incremental dumps append
+    only runs added since the last incremental export to the dump of the day,
+    long runs started before it and reused rowids included.
+
+    :param capsys: Builtin Pytest functionality
+    :param monkeypatch: Builtin Pytest functionality
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    db_name = str(tmp_path / "stats.db")
+    monkeypatch.setattr(fileops, "DUMP_FILE", str(tmp_path / "dbdump.csv"))
+    monkeypatch.setattr(fileops, "DUMP_DATED", str(tmp_path / "dbdump-{}.csv"))
+    monkeypatch.setattr(fileops, "DUMP_CHUNK", 2)
+
+    def add_run(run: int, start: str) -> None:
+        dbops.write_to_db(
+            "to file", "R&B", "2026-10-18", start, 2.0, run, 1, 0.5, db_name
+        )
+
+    def dumped(filename: str) -> list[list[str]]:
+        with open(tmp_path / filename, newline="") as f:
+            return list(csv.reader(f))
+
+    for run in range(1, 4):
+        add_run(run, f"12:00:0{run}")
+    cursor, db_conn = dbops.conn_to_db(db_name)
+    assert fileops.db_to_file(db_conn) == 3
+    rows = dumped("dbdump.csv")
+    assert rows[0][:3] == ["presentation_method", "solve_method", "test_date"]
+    assert [row[5] for row in rows[1:]] == ["1", "2", "3"]
+
+    # Full dump leaves the watermark alone.
+    dated = tmp_path / f"dbdump-{datetime.date.today()}.csv"
+    assert fileops.db_to_file(db_conn, incremental=True) == 3
+    dated.unlink()
+    assert fileops.db_to_file(db_conn, incremental=True) == 0
+    assert not dated.exists()
+
+    # A run started before the last export, but finished after it.
+    add_run(4, "11:00:00")
+    assert fileops.db_to_file(db_conn, incremental=True) == 1
+    dbops.get_data(db_conn, "delete", "4")
+    add_run(5, "12:00:05")
+    assert fileops.db_to_file(db_conn, incremental=True) == 1
+    rows = dumped(dated.name)
+    assert rows[0] == dumped("dbdump.csv")[0]
+    assert [row[5] for row in rows[1:]] == ["4", "5"]
+    db_conn.close()
+    capsys.readouterr()
+
+
+def test_solution_cache(monkeypatch, tmp_path):
+    """
+    Checks if solution cache gives the same results as solving, in order,
+    sends only puzzles not seen before to the solver, including transformed ones,
+    and drops least recently used solutions.
+
+    :param monkeypatch: Builtin Pytest functionality
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    unique = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    multiple = "679518243543729618821634957094350186358461729016890534485276391962183475137945862"
+    broken = "770000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    variant = "".join(unique[col * 9 + row] for row in range(9) for col in range(9))
+    variant = variant.translate(str.maketrans("12", "21"))
+    entries = [{"puzzle": unique}, {"puzzle": broken}, {"puzzle": multiple}] * 3
+    options = {"seed": 1, "budget": 0, "time_limit": 0.0}
+    monkeypatch.setattr(dbops, "CACHE_CHUNK", 2)
+    monkeypatch.setattr(dbops, "CACHE_AHEAD", 3)
+    monkeypatch.setattr(solvers, "BATCH_SIZE", 4)
+    solved = []
+
+    def solve(misses):
+        def record():
+            for entry in misses:
+                solved.append(entry)
+                yield entry
+
+        return solvers.solve_stream(9, record(), options)
+
+    expected = [
+        (entry, gridops.grid_to_str(grid), status)
+        for entry, grid, status, _, _ in solvers.solve_stream(9, iter(entries), options)
+    ]
+    db_name = str(tmp_path / "cache.db")
+    for _ in range(2):
+        solved.clear()
+        with dbops.SolutionCache(db_name) as cache:
+            results = list(cache.stream(iter(entries), solve))
+        assert [
+            (entry, gridops.grid_to_str(grid), status)
+            for entry, grid, status, _, _ in results
+        ] == expected
+        assert solved.count({"puzzle": unique}) <= 1
+        assert solved.count({"puzzle": multiple}) <= 1
+    assert cache.hits == 9 - len(solved)
+    assert solved and all(entry == {"puzzle": broken} for entry in solved)
+
+    solved.clear()
+    solution = gridops.make_grid({"puzzle": variant})
+    assert solvers.bitmask_solve(solution)
+    with dbops.SolutionCache(db_name, 1) as cache:
+        results = list(cache.stream([{"puzzle": multiple}, {"puzzle": variant}], solve))
+        form, transform = gridops.canonical_form(unique)
+        stored = cache.lookup([form])[form]
+    assert gridops.from_canonical(stored, transform) == expected[0][1]
+    assert results[1][1] == solution
+    assert cache.hits == 2 and solved == []
+    with dbops.SolutionCache(db_name) as cache:
+        assert list(cache.lookup([form, gridops.canonical_form(multiple)[0]])) == [form]
+
+def test_numpy_batch_solve():
+    """
+    Checks if batch solver handles a batch with an easy puzzle, a hard one needing
+    the fallback search, and one breaking the rules, each getting its own status.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    grids = [
+        gridops.make_grid({"puzzle": puzzle})
+        for puzzle in (
+            "070000043040009610800634900094052000358460020000800530080070091902100005007040802",
+            "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+            "770000043040009610800634900094052000358460020000800530080070091902100005007040802",
+        )
+    ]
+    assert solvers.numpy_batch_solve(grids) == [True, True, False]
+    assert (
+        gridops.grid_to_str(grids[0])
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+    assert (
+        gridops.grid_to_str(grids[1])
+        == "812753649943682175675491283154237896369845721287169534521974368438526917796318452"
+    )
+    assert "0" in gridops.grid_to_str(grids[2])
+    assert solvers.numpy_batch_solve([]) == []
+
+
+def test_random_walk():
+    """
+    Checks if seeded random walk solves a puzzle, gives up when out of budget
+    leaving the puzzle untouched, and spots a free cell without any valid value.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    puzzle = b"070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    grid = bytearray(puzzle)
+    assert solvers.random_walk(grid, random.Random(7))
+    assert (
+        gridops.grid_to_str(grid)
+        == "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    )
+    grid = bytearray(b"0" * 81)
+    assert solvers.random_walk(grid, random.Random(7), max_nodes=1) is None
+    assert grid == bytearray(b"0" * 81)
+    grid = bytearray(b"012345678900000000" + b"0" * 63)
+    assert solvers.random_walk(grid, random.Random(7)) is False
+
+
 def test_make_grid():
     """
     Checks if string conversion to a grid is valid
@@ -478,17 +1313,9 @@ def test_make_grid():
     :raises AssertionError: If test isn't valid
     """
 
-    grid = [
-        ["0", "7", "0", "0", "0", "0", "0", "4", "3"],
-        ["0", "4", "0", "0", "0", "9", "6", "1", "0"],
-        ["8", "0", "0", "6", "3", "4", "9", "0", "0"],
-        ["0", "9", "4", "0", "5", "2", "0", "0", "0"],
-        ["3", "5", "8", "4", "6", "0", "0", "2", "0"],
-        ["0", "0", "0", "8", "0", "0", "5", "3", "0"],
-        ["0", "8", "0", "0", "7", "0", "0", "9", "1"],
-        ["9", "0", "2", "1", "0", "0", "0", "0", "5"],
-        ["0", "0", "7", "0", "4", "0", "8", "0", "2"],
-    ]
+    grid = bytearray(
+        b"070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    )
 
     string = {
         "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
@@ -500,6 +1327,44 @@ def test_make_grid():
     assert gridops.make_grid(solution) != grid
 
 
+def test_sniff_head():
+    """
+    Checks if column order, delimiter and free cell mark are found from the head lines,
+    with or without a header line.
+
+    :raises AssertionError: If test isn't valid
+    """
+
+    puzzle = "070000043040009610800634900094052000358460020000800530080070091902100005007040802"
+    solution = "679518243543729618821634957794352186358461729216897534485276391962183475137945862"
+    dotted = puzzle.replace("0", ".")
+    assert validateops.sniff_head(
+        ["puzzle,solution\r\n"] + [f"{puzzle},{solution}\r\n"] * 3, True
+    ) == (["puzzle", "solution"], ",", "0")
+    assert validateops.sniff_head([f"{solution};{dotted}\n"] * 3, True) == (
+        ["solution", "puzzle"],
+        ";",
+        ".",
+    )
+    assert validateops.sniff_head([f"{dotted}\t{solution}\n"] * 3, True) == (
+        ["puzzle", "solution"],
+        "\t",
+        ".",
+    )
+    assert validateops.sniff_head(["puzzle\n", f"{puzzle}\n"], False) == (
+        ["puzzle"],
+        ",",
+        "0",
+    )
+    assert validateops.sniff_head(["puzzle\n", f"{dotted}\n"], False) == (
+        ["puzzle"],
+        ",",
+        ".",
+    )
+    with pytest.raises(SystemExit):
+        validateops.sniff_head([f"{solution},{solution}\n"] * 3, True)
+
+
 def test_validate_rows_puzzle():
     """
     Test puzzle data validation.
@@ -610,17 +1475,9 @@ def test_write_to_file():
     :raises AssertionError: If test isn't valid
     """
 
-    proper_sol = [
-        ["2", "9", "5", "7", "4", "3", "8", "6", "1"],
-        ["4", "3", "1", "8", "6", "5", "9", "2", "7"],
-        ["8", "7", "6", "1", "9", "2", "5", "4", "3"],
-        ["3", "8", "7", "4", "5", "9", "2", "1", "6"],
-        ["6", "1", "2", "3", "8", "7", "4", "9", "5"],
-        ["5", "4", "9", "2", "1", "6", "7", "3", "8"],
-        ["7", "6", "3", "5", "2", "4", "1", "8", "9"],
-        ["9", "2", "8", "6", "7", "1", "3", "5", "4"],
-        ["1", "5", "4", "9", "3", "8", "6", "7", "2"],
-    ]
+    proper_sol = bytearray(
+        b"295743861431865927876192543387459216612387495549216738763524189928671354154938672"
+    )
 
     proper_puz = {
         "puzzle": "007300054245080900003040070070960000000020760000801002008294016609108020000007003",
@@ -633,6 +1490,48 @@ def test_write_to_file():
     assert isinstance(file, open("results.csv", "r").__class__)
 
 
+def test_results_sink(tmp_path):
+    """
+    Checks if results sink keeps rows in the buffer until the batch is full,
+    writes the header only once for a file, writes what's left on close,
+    and moves a file with another header aside.
+
+    :param tmp_path: Builtin Pytest functionality
+    :raises AssertionError: If test isn't valid
+    """
+
+    results = tmp_path / "results.csv"
+    entry = {
+        "puzzle": "070000043040009610800634900094052000358460020000800530080070091902100005007040802",
+        "solution": "679518243543729618821634957794352186358461729216897534485276391962183475137945862",
+    }
+    grid = gridops.make_grid({"puzzle": entry["solution"]})
+    with fileops.ResultsSink(str(results), batch_size=3) as sink:
+        sink.write(entry, grid, "Bitmask CP", True, 1)
+        sink.write(entry, grid, "Bitmask CP", True, 1)
+        assert "Bitmask CP" not in results.read_text()
+        sink.write(entry, grid, "Bitmask CP", True, 1)
+        assert len(results.read_text().splitlines()) == 4
+    with fileops.ResultsSink(str(results)) as sink:
+        sink.write(entry, grid, "Bitmask CP")
+    lines = results.read_text().splitlines()
+    assert len(lines) == 5
+    assert lines[0] == ",".join(fileops.RESULTS_FIELDS)
+    assert lines[1].endswith(
+        f",Bitmask CP,{entry['puzzle']},{entry['solution']},True,{entry['solution']},1"
+    )
+    assert lines[4].endswith(",False,N/A,N/A")
+    sink.close()
+
+    # File of an older layout is moved aside, not appended to.
+    results.write_text(",".join(fileops.RESULTS_FIELDS[:-1]) + "\nold,row\n")
+    with fileops.ResultsSink(str(results)) as sink:
+        sink.write(entry, grid, "Bitmask CP")
+    assert results.read_text().splitlines()[0] == ",".join(fileops.RESULTS_FIELDS)
+    (rotated,) = tmp_path.glob("results-*.csv")
+    assert rotated.read_text().endswith("old,row\n")
+
+
 def test_cake_algo():
     """
     Tests if the output of Cake algorithm is as it should be.
@@ -640,231 +1539,8 @@ def test_cake_algo():
     :raises AssertionError: If test isn't valid
     """
 
-    proper_sol = [
-        ["2", "9", "5", "7", "4", "3", "8", "6", "1"],
-        ["4", "3", "1", "8", "6", "5", "9", "2", "7"],
-        ["8", "7", "6", "1", "9", "2", "5", "4", "3"],
-        ["3", "8", "7", "4", "5", "9", "2", "1", "6"],
-        ["6", "1", "2", "3", "8", "7", "4", "9", "5"],
-        ["5", "4", "9", "2", "1", "6", "7", "3", "8"],
-        ["7", "6", "3", "5", "2", "4", "1", "8", "9"],
-        ["9", "2", "8", "6", "7", "1", "3", "5", "4"],
-        ["1", "5", "4", "9", "3", "8", "6", "7", "2"],
-    ]
+    proper_sol = bytearray(
+        b"295743861431865927876192543387459216612387495549216738763524189928671354154938672"
+    )
     assert solvers.cake_algo(proper_sol) == "The cake is a LIE‼"
     assert solvers.cake_algo(proper_sol) != "There is no cake‼"
-
-
-def test_determine_headers():
-    """
-    Checks what is the output for give data set. This is another step of the data
-    provided in the input file.
-
-    :raises AssertionError: If test isn't valid
-    """
-
-    file = "sudoku.csv"
-    lines_loc = [
-        16,
-        180,
-        344,
-        508,
-        672,
-        836,
-        1000,
-        1164,
-        1328,
-        1492,
-        1656,
-        1820,
-        1984,
-        2148,
-        2312,
-        2476,
-        2640,
-        2804,
-        2968,
-        3132,
-        3296,
-        3460,
-        3624,
-        3788,
-        3952,
-        4116,
-        4280,
-        4444,
-        4608,
-        4772,
-        4936,
-        5100,
-        5264,
-        5428,
-        5592,
-        5756,
-        5920,
-        6084,
-        6248,
-        6412,
-        6576,
-        6740,
-        6904,
-        7068,
-        7232,
-        7396,
-        7560,
-        7724,
-        7888,
-        8052,
-        8216,
-        8380,
-        8544,
-        8708,
-        8872,
-        9036,
-        9200,
-        9364,
-        9528,
-        9692,
-        9856,
-        10020,
-        10184,
-        10348,
-        10512,
-        10676,
-        10840,
-        11004,
-        11168,
-        11332,
-        11496,
-        11660,
-        11824,
-        11988,
-        12152,
-        12316,
-        12480,
-        12644,
-        12808,
-        12972,
-        13136,
-        13300,
-        13464,
-        13628,
-        13792,
-        13956,
-        14120,
-        14284,
-        14448,
-        14612,
-        14776,
-        14940,
-        15104,
-        15268,
-        15432,
-        15596,
-        15760,
-        15924,
-        16088,
-        16252,
-        16416,
-        16580,
-        16744,
-        16908,
-        17072,
-        17236,
-        17400,
-        17564,
-        17728,
-        17892,
-        18056,
-        18220,
-        18384,
-        18548,
-        18712,
-        18876,
-        19040,
-        19204,
-        19368,
-        19532,
-        19696,
-        19860,
-        20024,
-        20188,
-        20352,
-        20516,
-        20680,
-        20844,
-        21008,
-        21172,
-        21336,
-        21500,
-        21664,
-        21828,
-        21992,
-        22156,
-        22320,
-        22484,
-        22648,
-        22812,
-        22976,
-        23140,
-        23304,
-        23468,
-        23632,
-        23796,
-        23960,
-        24124,
-        24288,
-        24452,
-        24616,
-        24780,
-        24944,
-        25108,
-        25272,
-        25436,
-        25600,
-        25764,
-        25928,
-        26092,
-        26256,
-        26420,
-        26584,
-        26748,
-        26912,
-        27076,
-        27240,
-        27404,
-        27568,
-        27732,
-        27896,
-        28060,
-        28224,
-        28388,
-        28552,
-        28716,
-        28880,
-        29044,
-        29208,
-        29372,
-        29536,
-        29700,
-        29864,
-        30028,
-        30192,
-        30356,
-        30520,
-        30684,
-        30848,
-        31012,
-        31176,
-        31340,
-        31504,
-        31668,
-        31832,
-        31996,
-        32160,
-        32324,
-        32488,
-        32652,
-    ]
-    assert validateops.determine_headers(file, lines_loc) == ["puzzle", "solution"]
-    assert validateops.determine_headers(file, lines_loc) != ["solution", "puzzle"]